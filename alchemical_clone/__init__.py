@@ -4,14 +4,31 @@ __all__ = [
     "AlchemicalIndex",
     "AlchemicalLab",
     "AlchemicalTable",
+    "ForeignKeyGraph",
     "utils",
+    "deferral",
+    "index_advisor",
+    "instrumentation",
+    "multi_schema",
+    "output",
     "plugins",
+    "reflection",
+    "schema_diff",
+    "sharding",
+    "snapshot",
+    "statistics",
+    "streaming",
+    "type_registry",
+    "watch",
 ]
 
-from . import plugins
+from . import (deferral, index_advisor, instrumentation, multi_schema, output,
+               plugins, reflection, schema_diff, sharding, snapshot,
+               statistics, streaming, type_registry, watch)
 from .alchemical_column import AlchemicalColumn
 from .alchemical_constraint import AlchemicalConstraint
 from .alchemical_index import AlchemicalIndex
 from .alchemical_lab import AlchemicalLab
 from .alchemical_table import AlchemicalTable
+from .foreign_key_graph import ForeignKeyGraph
 from .utils import utils
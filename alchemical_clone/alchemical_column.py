@@ -10,6 +10,23 @@ if typing.TYPE_CHECKING:
 
 class AlchemicalColumn:
     """An intermidiate representation of a SQLAlchemy column."""
+    __slots__ = (
+        "_column", 
+        "_table", 
+        "name", 
+        "implicit_primary_key", 
+        "type", 
+        "type_name", 
+        "type_imports", 
+        "type_length", 
+        "nullable", 
+        "comment", 
+        "server_default", 
+        "server_onupdate",
+        "deferred",
+        "deferred_group",
+    )
+
     def __init__(self, column: Column, table: "AlchemicalTable"):
         self._column = column
         self._table = table
@@ -17,10 +34,16 @@ class AlchemicalColumn:
         self.name: str = column.name
         self.implicit_primary_key: bool = None
         self.type: str = None
+        self.type_name: str = None
+        self.type_imports: typing.Tuple[typing.Tuple[str, str], ...] = None
+        self.type_length: typing.Optional[int] = None
         self.nullable: bool = None
         self.comment: typing.Optional[str] = None
         self.server_default: typing.Optional[str] = None
         self.server_onupdate: typing.Optional[str] = None
+        # Set by `deferral.defer_columns`
+        self.deferred: bool = False
+        self.deferred_group: typing.Optional[str] = None
 
     def __repr__(self) -> str:
         return f"<AlchemicalColumn {quoted_string(self.fullname)}>"
@@ -33,15 +56,71 @@ class AlchemicalColumn:
     def __hash__(self) -> int:
         return hash(self.fullname)
 
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any], table: "AlchemicalTable") -> "AlchemicalColumn":
+        """Rebuild a column from the output of `to_dict`, without a SQLAlchemy column."""
+
+        column = cls.__new__(cls)
+        column._column = None
+        column._table = table
+        column.name = data["name"]
+        column.implicit_primary_key = False
+        column.type = data["type"]
+        column.type_name = data["type_name"]
+        column.type_imports = tuple(tuple(type_import) for type_import in data.get("type_imports", [("sqlalchemy", column.type_name)]))
+        column.type_length = data.get("type_length")
+        column.nullable = data["nullable"]
+        column.comment = data["comment"]
+        column.server_default = data["server_default"]
+        column.server_onupdate = data["server_onupdate"]
+        # Deferral is set per clone by a deferral policy, so it isn't part of snapshots
+        column.deferred = False
+        column.deferred_group = None
+        return column
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "type_name": self.type_name,
+            "type_imports": [list(type_import) for type_import in self.type_imports],
+            "type_length": self.type_length,
+            "nullable": self.nullable,
+            "comment": self.comment,
+            "server_default": self.server_default,
+            "server_onupdate": self.server_onupdate,
+        }
+
     def compute_properties(self):
         self.implicit_primary_key = False
-        self.type_name = self._column.type.as_generic().__class__.__name__
-        self.type = repr(self._column.type.as_generic())
+        rendered_type = self._table.parent.type_registry.render(self._column.type)
+        self.type = rendered_type.expression
+        self.type_name = rendered_type.name
+        self.type_imports = rendered_type.imports
+        self.type_length = getattr(self._column.type, "length", None)
         self.nullable = self._column.nullable
         self.comment = quoted_string(self._column.comment) if self._column.comment is not None else None
         self.server_default = repr(self._column.server_default.arg.text) if self._column.server_default is not None else None
         self.server_onupdate = repr(self._column.server_onupdate.arg.text) if self._column.server_onupdate is not None else None
 
+    SIGNATURE_FIELDS = ("name", "type", "type_imports", "nullable", "comment", "server_default", "server_onupdate")
+
+    def signature(self) -> tuple:
+        """A hashable summary of the structure of this column in the database."""
+
+        return (self.name, self.type, self.type_imports, self.nullable, self.comment, self.server_default, self.server_onupdate)
+
+    def deferral(self) -> typing.Tuple[bool, typing.Optional[str]]:
+        """Whether this column is generated with `deferred()`, and in which group. This depends on the deferral
+        policy of a clone rather than on the database, so it isn't part of `signature`."""
+
+        return (self.deferred, self.deferred_group)
+
+    def detach(self):
+        """Drop the reference to the reflected SQLAlchemy column. Must be called after `compute_properties`."""
+
+        self._column = None
+
     def codegen(self, try_set_primary_key: bool = False) -> str:
         """Generate SQLAlchemy ORM code for this column."""
 
@@ -49,24 +128,37 @@ class AlchemicalColumn:
             if self.valid_primary_key:
                 self.implicit_primary_key = True
 
+        code = self._column_code(self.implicit_primary_key)
+        if self.deferred and not self.implicit_primary_key:
+            group = f", group={quoted_string(self.deferred_group)}" if self.deferred_group is not None else ""
+            code = f"deferred({code}{group})"
+        code = f"{self.name} = {code}"
+
+        return code
+
+    def codegen_core(self) -> str:
+        """Generate the SQLAlchemy Core `Column` for this column, to be used in a `Table`."""
+
+        return self._column_code(False)
+
+    def _column_code(self, primary_key: bool) -> str:
         optional_attributes = {
-            "primary_key": self.implicit_primary_key if self.implicit_primary_key else None,
+            "primary_key": primary_key if primary_key else None,
             "comment": self.comment,
             "server_default": self.server_default,
             "server_onupdate": self.server_onupdate,
         }
 
-        code = f"""{self.name} = Column({quoted_string(self.name)}, {self.type}, nullable={repr(self.nullable)}"""
+        code = [f"""Column({quoted_string(self.name)}, {self.type}, nullable={repr(self.nullable)}"""]
         for attr, value in optional_attributes.items():
             if value is not None:
-                code += f", {attr}={value}"
-        code += ")"
-
-        return code
+                code.append(f", {attr}={value}")
+        code.append(")")
+        return "".join(code)
     
     @property
     def valid_primary_key(self) -> bool:
-        return self._column.nullable is False
+        return self.nullable is False
     
     @property
     def target_name(self) -> str:
@@ -82,4 +174,8 @@ class AlchemicalColumn:
     
     @property
     def fullname(self) -> str:
+        """The name of this column, qualified by its table and, if it has one, its schema."""
+
+        if self._table.schema is not None:
+            return f"{self._table.schema}.{self._table.name}.{self.name}"
         return f"{self._table.name}.{self.name}"
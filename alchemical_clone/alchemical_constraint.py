@@ -3,7 +3,8 @@ import typing
 from sqlalchemy import (CheckConstraint, Constraint, ForeignKeyConstraint,
                         PrimaryKeyConstraint, UniqueConstraint)
 
-from .utils import quoted_string
+from .statistics import lazy_argument
+from .utils import foreign_key_target, quoted_string
 
 if typing.TYPE_CHECKING:
     from .alchemical_column import AlchemicalColumn
@@ -12,6 +13,22 @@ if typing.TYPE_CHECKING:
 
 class AlchemicalConstraint:
     """An intermediate representation of a SQLAlchemy constraint."""
+    __slots__ = (
+        "_constraint", 
+        "_table", 
+        "name", 
+        "type", 
+        "columns", 
+        "sqltext", 
+        "referred_table", 
+        "referenced_columns", 
+        "ondelete", 
+        "onupdate", 
+        "relationship_to",
+        "lazy",
+        "reverse_lazy",
+    )
+
     def __init__(self, constraint: Constraint, table: "AlchemicalTable"):
         if not isinstance(constraint, (CheckConstraint, ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint)):
             raise NotImplementedError(f"Unsupported constraint type: {constraint.__class__.__name__}")
@@ -22,14 +39,68 @@ class AlchemicalConstraint:
         self.name: str = constraint.name
         self.type: str = None
         self.columns: typing.List["AlchemicalColumn"] = None
+        self.sqltext: typing.Optional[str] = None
+        self.referred_table: typing.Optional["AlchemicalTable"] = None
         self.referenced_columns: typing.Optional[typing.List["AlchemicalColumn"]] = None
         self.ondelete: typing.Optional[str] = None
         self.onupdate: typing.Optional[str] = None
         self.relationship_to: typing.Optional["AlchemicalColumn"] = None
+        # Loading strategies of the relationships towards the referred table and back (see `statistics`)
+        self.lazy: typing.Optional[str] = None
+        self.reverse_lazy: typing.Optional[str] = None
         
     def __repr__(self) -> str:
         return f"<AlchemicalConstraint {self.type} {quoted_string(self.name)}>"
 
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any], table: "AlchemicalTable") -> "AlchemicalConstraint":
+        """Rebuild a constraint from the output of `to_dict`, without a SQLAlchemy constraint.
+        
+        Every table referenced by the constraint must already be part of the lab, with its columns.
+        """
+
+        constraint = cls.__new__(cls)
+        constraint._constraint = None
+        constraint._table = table
+        constraint.name = data["name"]
+        constraint.type = data["type"]
+        constraint.columns = [table.column_from_name(column) for column in data["columns"]]
+        constraint.sqltext = data["sqltext"]
+        constraint.referred_table = None
+        constraint.referenced_columns = None
+        constraint.ondelete = data["ondelete"]
+        constraint.onupdate = data["onupdate"]
+        constraint.relationship_to = None
+        constraint.lazy = data.get("lazy")
+        constraint.reverse_lazy = data.get("reverse_lazy")
+
+        if data["referred_table"] is not None:
+            referred_table = data["referred_table"]
+            constraint.referred_table = table.parent.table_from_name(referred_table["name"], referred_table["schema"])
+            constraint.referenced_columns = [constraint.referred_table.column_from_name(column) for column in data["referenced_columns"]]
+            if len(constraint.columns) == 1 and len(constraint.referenced_columns) == 1:
+                constraint.relationship_to = constraint.referenced_columns[0]
+        return constraint
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        referred_table = None
+        referenced_columns = None
+        if self.referred_table is not None:
+            referred_table = {"schema": self.referred_table.schema, "name": self.referred_table.name}
+            referenced_columns = [column.name for column in self.referenced_columns]
+        return {
+            "name": self.name,
+            "type": self.type,
+            "columns": [column.name for column in self.columns],
+            "sqltext": self.sqltext,
+            "referred_table": referred_table,
+            "referenced_columns": referenced_columns,
+            "ondelete": self.ondelete,
+            "onupdate": self.onupdate,
+            "lazy": self.lazy,
+            "reverse_lazy": self.reverse_lazy,
+        }
+
     def compute_properties(self):
         self.columns = []
         if isinstance(self._constraint, ForeignKeyConstraint):
@@ -37,24 +108,56 @@ class AlchemicalConstraint:
         else:
             self.columns = [self._table.column_from_name(column.name) for column in self._constraint.columns]
         self.type = self._constraint.__class__.__name__
+        self.sqltext = self._constraint.sqltext.text if isinstance(self._constraint, CheckConstraint) else None
 
         if isinstance(self._constraint, ForeignKeyConstraint):
-            fk = next(iter(self._constraint.elements))
-            self.referred_table = self._table.parent.table_from_name(fk.column.table.name)
-            self.referenced_columns = [self.referred_table.column_from_name(element.column.name) for element in self._constraint.elements]
+            # Resolve the target through the lab rather than the MetaData, which may not contain the referred table
+            targets = [foreign_key_target(element) for element in self._constraint.elements]
+            schema, table_name, _ = targets[0]
+            self.referred_table = self._table.parent.table_from_name(table_name, schema)
+            self.referenced_columns = [self.referred_table.column_from_name(column_name) for _, _, column_name in targets]
             if len(self.columns) == 1 and len(self.referenced_columns) == 1:
                 self.relationship_to = self.referenced_columns[0]
         
         self.ondelete = quoted_string(self._constraint.ondelete) if hasattr(self._constraint, "ondelete") and self._constraint.ondelete is not None else None
         self.onupdate = quoted_string(self._constraint.onupdate) if hasattr(self._constraint, "onupdate") and self._constraint.onupdate is not None else None
 
+    SIGNATURE_FIELDS = ("type", "name", "columns", "referred_table", "referenced_columns", "ondelete", "onupdate", "sqltext")
+
+    def signature(self) -> tuple:
+        """A hashable summary of the structure of this constraint in the database."""
+
+        referred_class_name = self.referred_table.class_name if self.referenced_columns is not None else None
+        referenced_columns = tuple(column.target_name for column in self.referenced_columns) if self.referenced_columns is not None else None
+        return (
+            self.type, 
+            self.name, 
+            tuple(column.name for column in self.columns), 
+            referred_class_name, 
+            referenced_columns, 
+            self.ondelete, 
+            self.onupdate, 
+            self.sqltext,
+        )
+
+    def loading(self) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+        """The loading strategies of the relationships generated for this constraint. These depend on the loading
+        policy rather than on the database, so they aren't part of `signature`."""
+
+        return (self.lazy, self.reverse_lazy)
+
+    def detach(self):
+        """Drop the reference to the reflected SQLAlchemy constraint. Must be called after `compute_properties`."""
+
+        self._constraint = None
+
     def codegen(self) -> str:
         """Generate SQLAlchemy ORM code for this constraint."""
-        constraint_type = self._constraint.__class__.__name__
+        constraint_type = self.type
 
         optional_attrs = {}
 
-        if len(self._constraint.columns) == 0 and not isinstance(self._constraint, CheckConstraint):
+        if len(self.columns) == 0 and constraint_type != "CheckConstraint":
             return None
         
         if self.name is not None:
@@ -64,29 +167,29 @@ class AlchemicalConstraint:
         if self.onupdate is not None:
             optional_attrs["onupdate"] = self.onupdate
 
-        if isinstance(self._constraint, ForeignKeyConstraint):
+        if constraint_type == "ForeignKeyConstraint":
             constraint_inner_code = f"[{', '.join([quoted_string(column.name) for column in self.columns])}]"
-        elif isinstance(self._constraint, CheckConstraint):
-            constraint_inner_code = quoted_string(self._constraint.sqltext.text)
+        elif constraint_type == "CheckConstraint":
+            constraint_inner_code = quoted_string(self.sqltext)
         else:
             constraint_inner_code = f"{', '.join([quoted_string(column.name) for column in self.columns])}"
         
-        code = f"{constraint_type}({constraint_inner_code}"
+        code = [f"{constraint_type}({constraint_inner_code}"]
 
-        if isinstance(self._constraint, ForeignKeyConstraint):
-            code += f", [{', '.join([quoted_string(column.target_name) for column in self.referenced_columns])}]"
+        if constraint_type == "ForeignKeyConstraint":
+            code.append(f", [{', '.join([quoted_string(column.target_name) for column in self.referenced_columns])}]")
 
         for attr, value in optional_attrs.items():
-            code += f", {attr}={value}"
-        code += ")"
+            code.append(f", {attr}={value}")
+        code.append(")")
 
-        return code
+        return "".join(code)
     
     def codegen_relationship(self) -> str:
         if self.has_relationship:
-            return f"{self.name} = relationship({quoted_string(self.referred_table.class_name)}, foreign_keys=[{', '.join([column.name for column in self.columns])}])"
+            return f"{self.name} = relationship({quoted_string(self.referred_table.class_name)}, foreign_keys=[{', '.join([column.name for column in self.columns])}]{lazy_argument(self.lazy)})"
         return None
 
     @property
     def has_relationship(self) -> bool:
-        return isinstance(self._constraint, ForeignKeyConstraint) and len(self.columns) == 1
+        return self.type == "ForeignKeyConstraint" and len(self.columns) == 1
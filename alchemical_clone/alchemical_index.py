@@ -11,6 +11,8 @@ if typing.TYPE_CHECKING:
 
 class AlchemicalIndex:
     """An intermediate representation of a SQLAlchemy index."""
+    __slots__ = ("_index", "_table", "name", "columns", "unique", "has_expressions")
+
     def __init__(self, index: Index, table: "AlchemicalTable"):
         self._index = index
         self._table = table
@@ -18,19 +20,61 @@ class AlchemicalIndex:
         self.name: str = index.name
         self.columns: typing.List["AlchemicalColumn"] = None
         self.unique: bool = None
+        self.has_expressions: bool = None
 
     def __repr__(self) -> str:
         return f"<AlchemicalIndex {quoted_string(self.name)}>"
     
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any], table: "AlchemicalTable") -> "AlchemicalIndex":
+        """Rebuild an index from the output of `to_dict`, without a SQLAlchemy index."""
+
+        index = cls.__new__(cls)
+        index._index = None
+        index._table = table
+        index.name = data["name"]
+        index.columns = [table.column_from_name(column) for column in data["columns"]]
+        index.unique = data["unique"]
+        index.has_expressions = data["has_expressions"]
+        return index
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "columns": [column.name for column in self.columns],
+            "unique": self.unique,
+            "has_expressions": self.has_expressions,
+        }
+
     def compute_properties(self):
         self.columns = [self._table.column_from_name(column.name) for column in self._index.columns]
-        self.unique = self._index.unique
+        # SQLite reflects uniqueness as 0 or 1
+        self.unique = bool(self._index.unique)
+        self.has_expressions = any(not isinstance(expression, Column) for expression in self._index.expressions)
+
+    SIGNATURE_FIELDS = ("name", "columns", "unique", "has_expressions")
+
+    def signature(self) -> tuple:
+        """A hashable summary of everything that affects the code generated for this index."""
+
+        return (self.name, tuple(column.name for column in self.columns), self.unique, self.has_expressions)
+
+    def detach(self):
+        """Drop the reference to the reflected SQLAlchemy index. Must be called after `compute_properties`."""
+
+        self._index = None
 
     def codegen(self) -> str:
         """Generate SQLAlchemy ORM code for this index."""
-        for expression in self._index.expressions:
-            if not isinstance(expression, Column):
-                raise NotImplementedError("Only columns are supported in index expressions.")
+        if self.has_expressions:
+            raise NotImplementedError("Only columns are supported in index expressions.")
 
         code = f"Index({quoted_string(self.name)}, {', '.join([column.class_property_name for column in self.columns])}, unique={self.unique})"
-        return code
\ No newline at end of file
+        return code
+
+    def codegen_core(self) -> str:
+        """Generate SQLAlchemy Core code for this index, to be used in a `Table`."""
+        if self.has_expressions:
+            raise NotImplementedError("Only columns are supported in index expressions.")
+
+        return f"Index({quoted_string(self.name)}, {', '.join([quoted_string(column.name) for column in self.columns])}, unique={self.unique})"
\ No newline at end of file
@@ -1,12 +1,32 @@
+import asyncio
+import concurrent.futures
 import dataclasses
+import hashlib
+import json
 import os
+import threading
 import typing
 
-from sqlalchemy import MetaData
+from sqlalchemy import Engine, ForeignKey, MetaData, Table
+from sqlalchemy.schema import sort_tables
 
 from .alchemical_table import AlchemicalTable
-from .generated_code import GeneratedCode
-from .utils import pascal_case
+from .deferral import DeferralPolicy, deferred_columns
+from .foreign_key_graph import ForeignKeyGraph
+from .generated_code import GENERATOR_VERSION, GeneratedCode
+from .instrumentation import Observer, measure
+from .output import (OutputSink, PathLike, incremental_output_sink,
+                     output_sink)
+from .plugin_cache import PluginCache
+from .reflection import TablePatterns, reflect, reflect_async
+from .sharding import ShardLayout, assign_shards
+from .snapshot import load_snapshot, restore_snapshot, save_snapshot
+from .statistics import LoadingPolicy, apply_statistics
+from .type_registry import TYPE_REGISTRY, TypeRegistry
+from .utils import foreign_key_target, pascal_case, quoted_string
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
 _BASE_FILE_CODE = """\
 __all__ = ["Base"]
@@ -17,6 +37,54 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 """
 
+_CORE_METADATA_FILE_CODE = """\
+__all__ = ["metadata"]
+
+from sqlalchemy import MetaData
+
+
+metadata = MetaData()
+"""
+
+_LAZY_INIT_FUNCTIONS_CODE = """\
+def __getattr__(name):
+    module_name = _MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    model = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = model
+    return model
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
+
+
+@event.listens_for(Mapper, "before_configured")
+def _load_relationship_targets():
+    # Relationships refer to their targets by class name, so every target of a loaded model must be loaded too
+    pending = True
+    while pending:
+        pending = False
+        for name, module_name in _MODULES.items():
+            if f"{__name__}.{module_name}" not in sys.modules:
+                continue
+            for dependency in _DEPENDENCIES.get(name, ()):
+                if f"{__name__}.{_MODULES[dependency]}" not in sys.modules:
+                    __getattr__(dependency)
+                    pending = True
+
+
+def load_all_models():
+    \"\"\"Import every model, for when the whole registry needs to be configured.\"\"\"
+
+    for name in _MODULES:
+        if name not in globals():
+            __getattr__(name)
+"""
+
+_MANIFEST_FILE = "_manifest.json"
+
 
 @dataclasses.dataclass
 class PluginImport:
@@ -31,79 +99,661 @@ PluginResult = typing.NamedTuple(
 )
 Plugin = typing.Callable[["AlchemicalLab"], PluginResult]
 
+# "orm" generates declarative classes, "core" generates `Table` objects instead, and "both" generates
+# the classes with the tables in a `core` subpackage
+CloneMode = typing.Literal["orm", "core", "both"]
+
+
+class _TableResult(typing.NamedTuple):
+    fingerprint: typing.Optional[str]
+    error: typing.Optional[NotImplementedError]
+
+
+def _clone_table(
+        sink: OutputSink, 
+        table: AlchemicalTable, 
+        plugin_code: typing.List[GeneratedCode], 
+        plugin_imports: typing.Dict[str, typing.Set[str]],
+        previous_manifest: typing.Optional[typing.Dict[str, str]],
+        observer: typing.Optional[Observer],
+        core: bool = False,
+    ) -> _TableResult:
+    fingerprint = None
+    if previous_manifest is not None:
+        fingerprint = _module_fingerprint(table, plugin_code, plugin_imports, core)
+        if previous_manifest.get(table.name) == fingerprint and sink.exists(f"{table.name}.py"):
+            return _TableResult(fingerprint, None)
+
+    try:
+        with measure(observer, "codegen", table.name) as measurement:
+            module_code = _core_table_module_code(table) if core else _table_module_code(table, plugin_code, plugin_imports)
+            measurement.count = len(module_code)
+    except NotImplementedError as e:
+        return _TableResult(fingerprint, e)
+
+    with measure(observer, "write", table.name) as measurement:
+        _write_module(sink, f"{table.name}.py", module_code, False)
+        measurement.count = len(module_code)
+    return _TableResult(fingerprint, None)
+
+def _table_module_code(
+        table: AlchemicalTable, 
+        plugin_code: typing.List[GeneratedCode], 
+        plugin_imports: typing.Dict[str, typing.Set[str]],
+    ) -> str:
+    body = _table_body_parts(table, plugin_code)
+
+    parts = _import_lines(_table_imports(table, plugin_imports))
+    parts.append("\n")
+    parts.append("from ._base import Base\n\n\n")
+    parts.extend(body)
+    return "".join(parts)
+
+def _table_imports(table: AlchemicalTable, plugin_imports: typing.Dict[str, typing.Set[str]]) -> typing.Dict[str, typing.Set[str]]:
+    imports = table.imports
+    for package, modules in plugin_imports.items():
+        imports.setdefault(package, set()).update(modules)
+    return imports
+
+def _table_body_parts(table: AlchemicalTable, plugin_code: typing.List[GeneratedCode]) -> typing.List[str]:
+    code = table.codegen()
+
+    parts = [code["table"]]
+    for segment in plugin_code:
+        if segment.location == "table":
+            parts.append("    " + segment.code + "\n")
+
+    parts.append("\n")
+    parts.append(code["end"])
+
+    for segment in plugin_code:
+        if segment.location == "end":
+            parts.append(segment.code + "\n")
+    return parts
+
+def _shard_imports(
+        shard: str, 
+        plugin_imports: typing.Dict[str, typing.Set[str]], 
+        modules: typing.Dict[str, str],
+    ) -> typing.Dict[str, typing.Set[str]]:
+    """`plugin_imports` of a table of `shard`, importing from the shards of other tables instead of their modules."""
+
+    imports: typing.Dict[str, typing.Set[str]] = {}
+    for package, names in plugin_imports.items():
+        module = modules.get(package[1:]) if package.startswith(".") else None
+        if module == shard:
+            continue
+        if module is not None:
+            package = f".{module}"
+        imports.setdefault(package, set()).update(names)
+    return imports
+
+def _clone_shard(
+        sink: OutputSink,
+        shard: str,
+        tables: typing.List[AlchemicalTable],
+        plugin_code: typing.Dict[str, typing.List[GeneratedCode]],
+        plugin_imports: typing.Dict[str, typing.Dict[str, typing.Set[str]]],
+        modules: typing.Dict[str, str],
+        previous_manifest: typing.Optional[typing.Dict[str, str]],
+        observer: typing.Optional[Observer],
+        core: bool = False,
+    ) -> typing.List[_TableResult]:
+    shard_imports = {table.name: _shard_imports(shard, plugin_imports.get(table.name, {}), modules) for table in tables}
+    fingerprint = None
+    if previous_manifest is not None:
+        fingerprint = hashlib.sha256(repr(tuple(
+            _module_fingerprint(table, plugin_code.get(table.name, []), shard_imports[table.name], core) for table in tables
+        )).encode()).hexdigest()
+        if previous_manifest.get(shard) == fingerprint and sink.exists(f"{shard}.py"):
+            return [_TableResult(fingerprint, None) for _ in tables]
+
+    results = []
+    imports: typing.Dict[str, typing.Set[str]] = {}
+    bodies = []
+    with measure(observer, "codegen", shard) as measurement:
+        for table in tables:
+            try:
+                if core:
+                    table_body, table_imports = [table.codegen_core()], table.core_imports
+                else:
+                    table_body = _table_body_parts(table, plugin_code.get(table.name, []))
+                    table_imports = _table_imports(table, shard_imports[table.name])
+            except NotImplementedError as e:
+                results.append(_TableResult(fingerprint, e))
+                continue
+            results.append(_TableResult(fingerprint, None))
+            bodies.append("".join(table_body).rstrip("\n") + "\n")
+            for package, names in table_imports.items():
+                imports.setdefault(package, set()).update(names)
+
+        parts = _import_lines(imports)
+        parts.append("\n")
+        parts.append("from ._metadata import metadata\n\n\n" if core else "from ._base import Base\n\n\n")
+        parts.append("\n\n".join(bodies))
+        module_code = "".join(parts)
+        measurement.count = len(module_code)
+
+    if len(bodies) > 0:
+        with measure(observer, "write", shard) as measurement:
+            _write_module(sink, f"{shard}.py", module_code, False)
+            measurement.count = len(module_code)
+    return results
+
+def _import_lines(imports: typing.Dict[str, typing.Set[str]]) -> typing.List[str]:
+    parts = []
+    import_packages = sorted([key.split(".") for key in imports.keys()])
+    for package in import_packages:
+        package_name = ".".join(package)
+        modules = sorted(imports[package_name])
+        if len(modules) > 0:
+            parts.append(f"from {package_name} import {', '.join(modules)}\n")
+    return parts
+
+def _core_table_module_code(table: AlchemicalTable) -> str:
+    code = table.codegen_core()
+    parts = _import_lines(table.core_imports)
+    parts.append("\n")
+    parts.append("from ._metadata import metadata\n\n\n")
+    parts.append(code)
+    return "".join(parts)
+
+def _core_init_module_code(tables: typing.List[AlchemicalTable], modules: typing.Optional[typing.Dict[str, str]] = None) -> str:
+    parts = ["__all__ = [\n", """    "metadata",\n"""]
+    for table in tables:
+        parts.append(f"""    "{table.core_name}",\n""")
+    parts.append("]\n\n")
+    for table in tables:
+        parts.append(f"from .{_module_name(table, modules)} import {table.core_name}\n")
+    # Imported last, since importing a table module named `metadata` binds that name to the module
+    parts.append("from ._metadata import metadata\n")
+    return "".join(parts)
+
+def _module_name(table: AlchemicalTable, modules: typing.Optional[typing.Dict[str, str]]) -> str:
+    """The module `table` is generated in: its own, unless it was put in a shard."""
+
+    return modules.get(table.name, table.name) if modules is not None else table.name
+
+def _init_module_code(tables: typing.List[AlchemicalTable], modules: typing.Optional[typing.Dict[str, str]] = None) -> str:
+    parts = ["__all__ = [\n", """    "_base",\n"""]
+    for table in tables:
+        class_name = pascal_case(table.name)
+        parts.append(f"""    "{class_name}",\n""")
+    parts.append("]\n\n")
+    parts.append("from . import _base\n")
+    for table in tables:
+        class_name = pascal_case(table.name)
+        parts.append(f"from .{_module_name(table, modules)} import {class_name}\n")
+    return "".join(parts)
+
+def _lazy_init_module_code(tables: typing.List[AlchemicalTable], modules: typing.Optional[typing.Dict[str, str]] = None) -> str:
+    generated = set(tables)
+    parts = ["__all__ = [\n", """    "_base",\n"""]
+    for table in tables:
+        parts.append(f"""    "{table.class_name}",\n""")
+    parts.append("    \"load_all_models\",\n")
+    parts.append("]\n\n")
+    parts.append("import importlib\nimport sys\n\n")
+    parts.append("from sqlalchemy import event\nfrom sqlalchemy.orm import Mapper\n\n")
+    parts.append("from . import _base\n\n")
+
+    parts.append("_MODULES = {\n")
+    for table in tables:
+        parts.append(f"""    "{table.class_name}": "{_module_name(table, modules)}",\n""")
+    parts.append("}\n\n")
+
+    parts.append("_DEPENDENCIES = {\n")
+    for table in tables:
+        dependencies = sorted({
+            constraint.referred_table.class_name 
+            for constraint in table.constraints 
+            if constraint.has_relationship and constraint.referred_table != table and constraint.referred_table in generated
+        })
+        if len(dependencies) > 0:
+            parts.append(f"""    "{table.class_name}": ({", ".join(quoted_string(dependency) for dependency in dependencies)},),\n""")
+    parts.append("}\n\n\n")
+
+    parts.append(_LAZY_INIT_FUNCTIONS_CODE)
+    return "".join(parts)
+
+def _module_fingerprint(
+        table: AlchemicalTable, 
+        plugin_code: typing.List[GeneratedCode], 
+        plugin_imports: typing.Dict[str, typing.Set[str]],
+        core: bool = False,
+    ) -> str:
+    contributions = (
+        GENERATOR_VERSION,
+        table.fingerprint(),
+        table.deferrals(),
+        table.loadings(),
+        tuple((segment.location, segment.code) for segment in plugin_code),
+        tuple(sorted((package, tuple(sorted(modules))) for package, modules in plugin_imports.items())),
+    )
+    if core:
+        contributions += ("core",)
+    return hashlib.sha256(repr(contributions).encode()).hexdigest()
+
+def _write_module(sink: OutputSink, filename: str, code: str, skip_unchanged: bool):
+    if skip_unchanged and sink.read(filename) == code:
+        return
+    sink.write(filename, code)
+
+def _read_manifest(sink: OutputSink) -> typing.Dict[str, str]:
+    manifest = sink.read(_MANIFEST_FILE)
+    if manifest is None:
+        return {}
+    return json.loads(manifest).get("modules", {})
+
+def _write_manifest(sink: OutputSink, modules: typing.Dict[str, str]):
+    manifest = {"generator_version": GENERATOR_VERSION, "modules": modules}
+    _write_module(sink, _MANIFEST_FILE, json.dumps(manifest, indent=4, sort_keys=True) + "\n", True)
+
+def _fullname(table: AlchemicalTable) -> str:
+    return f"{table.schema}.{table.name}" if table.schema is not None else table.name
+
+def _sorted_tables(metadata: MetaData) -> typing.List[Table]:
+    """The tables of `metadata` in the same order as `metadata.sorted_tables`, ignoring foreign keys
+    to tables that are not part of it instead of failing to resolve them."""
+
+    def is_dangling(foreign_key: ForeignKey) -> bool:
+        schema, table_name, _ = foreign_key_target(foreign_key)
+        return (f"{schema}.{table_name}" if schema is not None else table_name) not in metadata.tables
+
+    return sort_tables(sorted(metadata.tables.values(), key=lambda table: table.key), skip_fn=is_dangling)
+
 class AlchemicalLab:
-    def __init__(self, metadata: MetaData):
+    def __init__(
+            self, 
+            metadata: typing.Optional[MetaData] = None, 
+            detach: bool = False, 
+            observer: typing.Optional[Observer] = None,
+            type_registry: typing.Optional[TypeRegistry] = None,
+        ):
         self._metadata = metadata
-        self.tables = [AlchemicalTable(table, self) for table in metadata.sorted_tables]
-        for table in self.tables:
-            table.compute_properties()
+        self.observer = observer
+        self.type_registry = type_registry if type_registry is not None else TYPE_REGISTRY
+        self._foreign_key_graph: typing.Optional[ForeignKeyGraph] = None
+        self.tables: typing.List[AlchemicalTable] = []
+        self._tables_by_name: typing.Dict[str, typing.List[AlchemicalTable]] = {}
+        self._tables_by_key: typing.Dict[typing.Tuple[typing.Optional[str], str], AlchemicalTable] = {}
+        self._clone_lock = threading.Lock()
+        if metadata is None:
+            return
+
+        with measure(observer, "lab") as lab_measurement:
+            for table in _sorted_tables(metadata):
+                self.add_table(AlchemicalTable(table, self))
+            for table in self.tables:
+                with measure(observer, "compute_properties", table.name) as measurement:
+                    table.compute_properties()
+                    measurement.count = len(table.columns)
+            lab_measurement.count = len(self.tables)
+        if detach:
+            self.detach()
+
+    @classmethod
+    def from_engine(
+            cls, 
+            engine: Engine, 
+            schema: typing.Optional[str] = None, 
+            workers: int = 4, 
+            bulk: bool = True, 
+            observer: typing.Optional[Observer] = None,
+            include: typing.Optional[TablePatterns] = None,
+            exclude: typing.Optional[TablePatterns] = None,
+            fk_depth: typing.Optional[int] = None,
+            type_registry: typing.Optional[TypeRegistry] = None,
+            loading_policy: typing.Optional[LoadingPolicy] = None,
+        ) -> "AlchemicalLab":
+        """Reflect the database behind `engine` and build a lab from it.
+        
+        If `bulk` is set and the dialect has a bulk catalog reflector, the schema is read with a handful of
+        catalog queries. Otherwise, SQLAlchemy's reflection is used with up to `workers` concurrent connections.
+
+        `include` and `exclude` select tables by glob pattern or compiled regular expression. Only the selected
+        tables are reflected, plus the tables their foreign keys refer to, transitively or up to `fk_depth` levels
+        away. Foreign keys to tables left out by `fk_depth` are dropped from the lab.
+
+        Column types are rendered by `type_registry` (see `type_registry.TypeRegistry`), or the shared
+        `TYPE_REGISTRY` if none is given.
+
+        With a `loading_policy`, the size of every table is estimated (see `statistics`) and relationships are
+        generated with the loading strategy the policy picks for them, instead of SQLAlchemy's default lazy loading.
+        """
+
+        with measure(observer, "reflection") as measurement:
+            metadata = reflect(engine, schema=schema, workers=workers, bulk=bulk, include=include, exclude=exclude, fk_depth=fk_depth)
+            measurement.count = len(metadata.tables)
+        lab = cls(metadata, detach=True, observer=observer, type_registry=type_registry)
+        if loading_policy is not None:
+            apply_statistics(engine, lab, loading_policy)
+        return lab
+
+    @classmethod
+    async def from_async_engine(
+            cls, 
+            engine: "AsyncEngine", 
+            schema: typing.Optional[str] = None, 
+            workers: int = 4, 
+            bulk: bool = True, 
+            observer: typing.Optional[Observer] = None,
+            include: typing.Optional[TablePatterns] = None,
+            exclude: typing.Optional[TablePatterns] = None,
+            fk_depth: typing.Optional[int] = None,
+            type_registry: typing.Optional[TypeRegistry] = None,
+            loading_policy: typing.Optional[LoadingPolicy] = None,
+        ) -> "AlchemicalLab":
+        """Like `from_engine`, for an `AsyncEngine`. Batches of tables are reflected concurrently with `run_sync`,
+        and the lab is built in a worker thread, so the event loop is never blocked."""
+
+        with measure(observer, "reflection") as measurement:
+            metadata = await reflect_async(engine, schema=schema, workers=workers, bulk=bulk, include=include, exclude=exclude, fk_depth=fk_depth)
+            measurement.count = len(metadata.tables)
+        lab = await asyncio.to_thread(lambda: cls(metadata, detach=True, observer=observer, type_registry=type_registry))
+        if loading_policy is not None:
+            async with engine.connect() as connection:
+                await connection.run_sync(apply_statistics, lab, loading_policy)
+        return lab
+
+    @classmethod
+    def from_snapshot(cls, path: typing.Union[str, os.PathLike]) -> "AlchemicalLab":
+        """Rebuild a lab from a snapshot written by `to_snapshot`, without reflecting the database."""
+
+        lab = cls()
+        restore_snapshot(lab, load_snapshot(path))
+        return lab
+
+    def to_snapshot(self, path: typing.Union[str, os.PathLike]):
+        """Save the intermediate representation of this lab to `path`, so it can be rebuilt with `from_snapshot`."""
+
+        save_snapshot(self, path)
+
+    def create_clone(
+            self,
+            directory: typing.Union[PathLike, OutputSink], 
+            plugins: typing.Optional[typing.List[Plugin]] = None,
+            incremental: bool = False,
+            jobs: int = 1,
+            lazy: bool = False,
+            plugin_cache: typing.Optional[PluginCache] = None,
+            deferral_policy: typing.Optional[DeferralPolicy] = None,
+            mode: CloneMode = "orm",
+            layout: typing.Optional[ShardLayout] = None,
+        ) -> typing.List[AlchemicalTable]:
+        """Generate a package with SQLAlchemy ORM classes for the given metadata.
+
+        In incremental mode, a manifest with a fingerprint of every generated module is kept in the
+        output directory, and only the modules whose fingerprint changed since the last run are rewritten.
+        Modules of tables that are no longer generated are deleted, so an incremental clone can't be written to a
+        sink that can't remove modules, such as an `output.ZipSink` (a ValueError is raised before anything is done).
+
+        With `jobs` greater than one, table modules are generated and written by a pool of that many
+        threads. The output is the same as when generating them one by one.
+
+        In lazy mode, the package's `__init__.py` only imports a model the first time it is accessed, instead
+        of importing every model upfront. The models that relationships point to are loaded before the mappers
+        are configured. The generated `load_all_models()` imports all of them.
+
+        Plugins are run concurrently when `jobs` is greater than one. If a `plugin_cache` is given, the result
+        of each plugin is looked up there first, and only computed (and stored) if the lab changed.
+
+        With a `deferral_policy`, large columns (e.g. `TEXT`, `BLOB` or `JSON`) are generated with `deferred()`,
+        so they are only loaded when accessed (see `deferral.DeferralPolicy`). The policy only applies to this
+        clone: the lab's columns are left as they were.
+
+        In "core" `mode`, a plain SQLAlchemy Core `Table` is generated for every table instead of an ORM class,
+        on a `metadata` object shared by the package, with its columns, constraints and indexes only. In "both"
+        mode, the tables are generated in a `core` subpackage next to the ORM classes. Plugins, lazy loading and
+        deferral only apply to the ORM classes.
+
+        `directory` can also be an `output.OutputSink`, to write the package somewhere other than a directory
+        (e.g. to memory or a zip archive). Every module written to a directory replaces the previous one atomically.
+
+        With a `layout`, the models are packed into a few shard modules instead of a module per table, so importing
+        the package opens far fewer files (see `sharding.ShardLayout`). The package's `__init__.py` and the imports
+        added by plugins refer to the shards instead.
+
+        Every table is generated in a module and class named after it, so a ValueError is raised if two tables
+        (e.g. with the same name in different schemas) would share one.
+
+        Returns the tables that were generated (as ORM classes, unless in "core" mode). Tables without a primary
+        key are left out.
+        """
+
+        if mode not in ("orm", "core", "both"):
+            raise ValueError(f"Unknown clone mode: {mode!r}")
+
+        self._check_generated_names()
+        sink = incremental_output_sink(directory) if incremental else output_sink(directory)
+        # The deferral policy only applies to this clone, so clones of the same lab must not overlap
+        with self._clone_lock, measure(self.observer, "create_clone") as measurement:
+            with deferred_columns(self, deferral_policy):
+                if mode != "core":
+                    generated_tables = self._create_clone(sink, plugins, incremental, jobs, lazy, plugin_cache, layout)
+                if mode != "orm":
+                    core_tables = self._create_core_clone(sink if mode == "core" else sink.child("core"), incremental, jobs, layout)
+            measurement.count = len(self.tables)
+        return generated_tables if mode != "core" else core_tables
+
+    async def acreate_clone(
+            self,
+            directory: typing.Union[PathLike, OutputSink], 
+            plugins: typing.Optional[typing.List[Plugin]] = None,
+            incremental: bool = False,
+            jobs: int = 1,
+            lazy: bool = False,
+            plugin_cache: typing.Optional[PluginCache] = None,
+            deferral_policy: typing.Optional[DeferralPolicy] = None,
+            mode: CloneMode = "orm",
+            layout: typing.Optional[ShardLayout] = None,
+        ) -> typing.List[AlchemicalTable]:
+        """Like `create_clone`, but generates and writes the package in a worker thread, so the event loop
+        keeps running and several clones can be generated concurrently."""
+
+        return await asyncio.to_thread(self.create_clone, directory, plugins, incremental, jobs, lazy, plugin_cache, deferral_policy, mode, layout)
+
+    def _create_clone(
+            self,
+            sink: OutputSink, 
+            plugins: typing.Optional[typing.List[Plugin]],
+            incremental: bool,
+            jobs: int,
+            lazy: bool,
+            plugin_cache: typing.Optional[PluginCache],
+            layout: typing.Optional[ShardLayout],
+        ) -> typing.List[AlchemicalTable]:
+
+        plugin_code, plugin_imports = self._run_plugins(plugins or [], jobs, plugin_cache)
+        init_module_code = _lazy_init_module_code if lazy else _init_module_code
+        return self._write_package(
+            sink, "_base.py", _BASE_FILE_CODE, plugin_code, plugin_imports, init_module_code, incremental, jobs, False, layout
+        )
 
-    def create_clone(self, directory: typing.Union[str, bytes, os.PathLike], plugins: typing.Optional[typing.List[Plugin]] = None):
-        """Generate a package with SQLAlchemy ORM classes for the given metadata."""
+    def _create_core_clone(self, sink: OutputSink, incremental: bool, jobs: int, layout: typing.Optional[ShardLayout]) -> typing.List[AlchemicalTable]:
+        return self._write_package(
+            sink, "_metadata.py", _CORE_METADATA_FILE_CODE, {}, {}, _core_init_module_code, incremental, jobs, True, layout
+        )
+
+    def _write_package(
+            self,
+            sink: OutputSink, 
+            shared_module: str,
+            shared_module_code: str,
+            plugin_code: typing.Dict[str, typing.List[GeneratedCode]],
+            plugin_imports: typing.Dict[str, typing.Dict[str, typing.Set[str]]],
+            init_module_code: typing.Callable[[typing.List[AlchemicalTable], typing.Dict[str, str]], str],
+            incremental: bool,
+            jobs: int,
+            core: bool,
+            layout: typing.Optional[ShardLayout] = None,
+        ) -> typing.List[AlchemicalTable]:
+        previous_manifest = _read_manifest(sink) if incremental else {}
+        manifest: typing.Dict[str, str] = {}
+
+        _write_module(sink, shared_module, shared_module_code, incremental)
+
+        # Every module with the tables generated in it, a single one unless there is a layout
+        if layout is not None:
+            package_modules = list(assign_shards(self, layout, plugin_imports).items())
+        else:
+            package_modules = [(table.name, [table]) for table in self.tables]
+        modules = {table.name: module_name for module_name, tables in package_modules for table in tables}
+
+        def clone_module(package_module: typing.Tuple[str, typing.List[AlchemicalTable]]) -> typing.List[_TableResult]:
+            module_name, tables = package_module
+            if layout is None:
+                table = tables[0]
+                return [_clone_table(
+                    sink, 
+                    table, 
+                    plugin_code.get(table.name, []), 
+                    plugin_imports.get(table.name, {}), 
+                    previous_manifest if incremental else None,
+                    self.observer,
+                    core,
+                )]
+            return _clone_shard(
+                sink,
+                module_name,
+                tables,
+                plugin_code,
+                plugin_imports,
+                modules,
+                previous_manifest if incremental else None,
+                self.observer,
+                core,
+            )
+
+        if jobs > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(clone_module, package_modules))
+        else:
+            results = map(clone_module, package_modules)
+
+        generated = set()
+        written_modules = set()
+        for (module_name, tables), module_results in zip(package_modules, results):
+            failed = False
+            for table, result in zip(tables, module_results):
+                if result.error is not None:
+                    print(f"Error generating table {table.name}: {result.error}")
+                    failed = True
+                    continue
+                generated.add(table)
+                written_modules.add(module_name)
+            # A module with a table that failed is generated again next time
+            if incremental and not failed:
+                manifest[module_name] = module_results[0].fingerprint
+        generated_tables = [table for table in self.tables if table in generated]
+
+        _write_module(sink, "__init__.py", init_module_code(generated_tables, modules), incremental)
+
+        if incremental:
+            for module_name in previous_manifest.keys() - manifest.keys() - written_modules:
+                sink.remove(f"{module_name}.py")
+            _write_manifest(sink, manifest)
+        return generated_tables
+
+    @property
+    def foreign_key_graph(self) -> ForeignKeyGraph:
+        """The graph of foreign keys between the tables of this lab, built on first access."""
+
+        if self._foreign_key_graph is None:
+            with measure(self.observer, "foreign_key_graph") as measurement:
+                self._foreign_key_graph = ForeignKeyGraph(self.tables)
+                measurement.count = len(self._foreign_key_graph.edge_counts)
+        return self._foreign_key_graph
+
+    def fingerprint(self) -> str:
+        """A stable hash of the structure and relationship loading strategies of every table in this lab, in order."""
+
+        fingerprints = (GENERATOR_VERSION, tuple((table.fingerprint(), table.loadings()) for table in self.tables))
+        return hashlib.sha256(repr(fingerprints).encode()).hexdigest()
+
+    def _run_plugin(self, plugin: Plugin, plugin_cache: typing.Optional[PluginCache], lab_fingerprint: typing.Optional[str]) -> PluginResult:
+        with measure(self.observer, "plugin", getattr(plugin, "__name__", repr(plugin))) as measurement:
+            result = plugin_cache.get(plugin, lab_fingerprint) if plugin_cache is not None else None
+            if result is None:
+                result = plugin(self)
+                if plugin_cache is not None:
+                    plugin_cache.put(plugin, lab_fingerprint, result)
+            measurement.count = sum(len(code) for code in result.code.values())
+        return result
+
+    def _run_plugins(
+            self,
+            plugins: typing.List[Plugin],
+            jobs: int,
+            plugin_cache: typing.Optional[PluginCache],
+        ) -> typing.Tuple[typing.Dict[str, typing.List[GeneratedCode]], typing.Dict[str, typing.Dict[str, typing.Set[str]]]]:
+        lab_fingerprint = self.fingerprint() if plugin_cache is not None else None
+        run_plugin = lambda plugin: self._run_plugin(plugin, plugin_cache, lab_fingerprint)
+
+        if jobs > 1 and len(plugins) > 1:
+            # Build the shared graph before the plugins race to do it
+            self.foreign_key_graph
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(run_plugin, plugins))
+        else:
+            results = map(run_plugin, plugins)
 
         plugin_code: typing.Dict[str, typing.List[GeneratedCode]] = {}
-        plugin_imports: typing.Dict[str, typing.Dict[str, typing.List[str]]] = {}
-        for plugin in plugins or []:
-            result = plugin(self)
+        plugin_imports: typing.Dict[str, typing.Dict[str, typing.Set[str]]] = {}
+        for result in results:
             for table_name, code in result.code.items():
                 plugin_code.setdefault(table_name, []).extend(code)
             for table, import_list in result.imports.items():
                 plugin_imports.setdefault(table, {})
                 for import_item in import_list:
                     plugin_imports[table].setdefault(import_item.package, set()).update(import_item.modules)
+        return plugin_code, plugin_imports
+    
+    def detach(self):
+        """Release the reflected SQLAlchemy objects, so the MetaData can be garbage-collected
+        if nothing else refers to it. Code generation only needs the intermediate representation."""
 
-        os.makedirs(directory, exist_ok=True)
-        with open(os.path.join(directory, "_base.py"), "w") as f:
-            f.write(_BASE_FILE_CODE)
-
-        generated_tables = []
         for table in self.tables:
-            try:
-                code = table.codegen()
-            except NotImplementedError as e:
-                print(f"Error generating table {table.name}: {e}")
-                continue
-            
-            with open(os.path.join(directory, f"{table.name}.py"), "w") as f:
-                imports = table.imports
-                table_plugin_imports = plugin_imports.get(table.name, {})
-                for package, modules in table_plugin_imports.items():
-                    imports.setdefault(package, set()).update(modules)
-
-                import_packages = sorted([key.split(".") for key in imports.keys()])
-                for package in import_packages:
-                    package_name = ".".join(package)
-                    modules = sorted(imports[package_name])
-                    if len(modules) > 0:
-                        f.write(f"from {package_name} import {', '.join(modules)}\n")
-                f.write("\n")
-                f.write("from ._base import Base\n\n\n")
-                f.write(code["table"])
-
-                for segment in plugin_code.get(table.name, []):
-                    if segment.location == "table":
-                        f.write("    " + segment.code + "\n")
-
-                f.write("\n")
-                f.write(code["end"])
-
-                for segment in plugin_code.get(table.name, []):
-                    if segment.location == "end":
-                        f.write(segment.code + "\n")
-            
-            generated_tables.append(table)
-
-        with open(os.path.join(directory, "__init__.py"), "w") as f:
-            f.write("__all__ = [\n")
-            f.write("""    "_base",\n""")
-            for table in generated_tables:
-                class_name = pascal_case(table.name)
-                f.write(f"""    "{class_name}",\n""")
-            f.write("]\n\n")
-            f.write(f"from . import _base\n")
-            for table in generated_tables:
-                class_name = pascal_case(table.name)
-                f.write(f"from .{table.name} import {class_name}\n")
-    
-    def table_from_name(self, name: str) -> typing.Optional[AlchemicalTable]:
-        return next((table for table in self.tables if table.name == name), None)
+            table.detach()
+        self._metadata = None
+
+    def add_table(self, table: AlchemicalTable):
+        """Register a table with this lab, keeping the name lookups up to date."""
+
+        key = (table.schema, table.name)
+        if key in self._tables_by_key:
+            raise ValueError(f"Table {table.name} is already part of this lab (schema {table.schema}).")
+        self.tables.append(table)
+        self._foreign_key_graph = None
+        self._tables_by_key[key] = table
+        self._tables_by_name.setdefault(table.name, []).append(table)
+
+    def _check_generated_names(self):
+        """Every table is generated in a module named after it, as a class named after it, whatever its schema.
+        Raise a ValueError if two tables of this lab would end up in the same module or class."""
+
+        for kind, key in (("module", lambda table: table.name), ("class", lambda table: table.class_name)):
+            tables_by_key: typing.Dict[str, AlchemicalTable] = {}
+            for table in self.tables:
+                other = tables_by_key.setdefault(key(table), table)
+                if other is not table:
+                    raise ValueError(
+                        f"Tables {_fullname(other)} and {_fullname(table)} would both be generated as the {kind} "
+                        f"{key(table)}. Clone their schemas separately (e.g. with `multi_schema.clone_schemas`)."
+                    )
+
+    def table_from_name(self, name: str, schema: typing.Optional[str] = None) -> typing.Optional[AlchemicalTable]:
+        """Find a table by name. If no table matches the schema exactly and no schema was
+        given, the first table with this name in any schema is returned."""
+
+        table = self._tables_by_key.get((schema, name))
+        if table is None and schema is None:
+            tables = self._tables_by_name.get(name)
+            if tables:
+                table = tables[0]
+        return table
+
+    def tables_from_name(self, name: str) -> typing.List[AlchemicalTable]:
+        """Find every table with this name, across all schemas."""
+
+        return list(self._tables_by_name.get(name, ()))
@@ -1,16 +1,24 @@
+import hashlib
 import typing
+import warnings
 
-from sqlalchemy import Table
+import sqlalchemy
+from sqlalchemy import ForeignKeyConstraint, Table
 
 from .alchemical_column import AlchemicalColumn
 from .alchemical_constraint import AlchemicalConstraint
 from .alchemical_index import AlchemicalIndex
 from .generated_code import CodeLocation
-from .utils import pascal_case, quoted_string
+from .utils import (foreign_key_target, pascal_case, python_identifier,
+                    quoted_string)
 
 if typing.TYPE_CHECKING:
     from .alchemical_lab import AlchemicalLab
 
+# Names a Core table variable can't take, besides keywords: the package's `metadata` and the classes (schema
+# items and types) a Core module can import from SQLAlchemy
+_CORE_RESERVED_NAMES = {"metadata"} | {name for name in dir(sqlalchemy) if name[:1].isupper()}
+
 
 class Relationship(typing.NamedTuple):
     from_: AlchemicalColumn
@@ -18,18 +26,35 @@ class Relationship(typing.NamedTuple):
 
 class AlchemicalTable:
     """An intermediate representation of a SQLAlchemy table."""
+    __slots__ = (
+        "_table", 
+        "parent", 
+        "name", 
+        "class_name", 
+        "schema", 
+        "comment", 
+        "columns", 
+        "_columns_by_name", 
+        "constraints", 
+        "indexes", 
+        "relationships",
+        "core_name",
+    )
+
     def __init__(self, table: Table, parent: "AlchemicalLab"):
         self._table = table
         self.parent = parent
 
         self.name: str = table.name
         self.class_name: str = None
-        self.schema: typing.Optional[str] = None
+        self.schema: typing.Optional[str] = table.schema
         self.comment: typing.Optional[str] = None
         self.columns: typing.List[AlchemicalColumn] = None
+        self._columns_by_name: typing.Dict[str, AlchemicalColumn] = {}
         self.constraints: typing.List[AlchemicalConstraint] = None
         self.indexes: typing.List[AlchemicalIndex] = None
         self.relationships: typing.List[Relationship] = []
+        self.core_name: str = None
     
     def __repr__(self) -> str:
         return f"<AlchemicalTable {quoted_string(self.name)}>"
@@ -37,51 +62,174 @@ class AlchemicalTable:
     def __eq__(self, other) -> bool:
         if not isinstance(other, AlchemicalTable):
             return False
-        return self.name == other.name
+        return self.schema == other.schema and self.name == other.name
     
     def __hash__(self) -> int:
-        return hash(self.name)
+        return hash((self.schema, self.name))
 
     def compute_properties(self):
+        self.compute_column_properties()
+        self.compute_constraint_properties()
+
+    def compute_column_properties(self):
+        """Compute the properties that only depend on this table: its name, comment and columns."""
+
         self.class_name = pascal_case(self.name)
         self.comment = quoted_string(self._table.comment) if self._table.comment is not None else None
         self.schema = self._table.schema if self._table.schema is not None else None
 
         self.columns = [AlchemicalColumn(column, self) for column in self._table.columns]
+        self._columns_by_name = {column.name: column for column in self.columns}
         for column in self.columns:
             column.compute_properties()
 
-        self.constraints = [AlchemicalConstraint(constraint, self) for constraint in self._table.constraints]
+    def compute_constraint_properties(self):
+        """Compute the constraints, relationships and indexes of this table. The column properties of
+        every table its foreign keys refer to must have been computed already."""
 
-        relationships = set()
+        self.constraints = []
+        for constraint in self._table.constraints:
+            if isinstance(constraint, ForeignKeyConstraint) and not self._refers_to_lab(constraint):
+                warnings.warn(f"Skipped foreign key {constraint.name} of table {self.name}, which refers to a table outside the lab")
+                continue
+            self.constraints.append(AlchemicalConstraint(constraint, self))
         for constraint in self.constraints:
             constraint.compute_properties()
+        self._compute_relationships()
+
+        self.indexes = [AlchemicalIndex(index, self) for index in self._table.indexes]
+        for index in self.indexes:
+            index.compute_properties()
+        self._compute_core_name()
+
+    def _refers_to_lab(self, constraint: ForeignKeyConstraint) -> bool:
+        schema, table_name, _ = foreign_key_target(next(iter(constraint.elements)))
+        return self.parent.table_from_name(table_name, schema) is not None
+
+    def _compute_relationships(self):
+        relationships = set()
+        for constraint in self.constraints:
             if constraint.relationship_to is not None:
                 new_relationsip = (constraint.referred_table.class_name, constraint.relationship_to)
                 if new_relationsip not in relationships:
                     relationships.add(new_relationsip)
                     self.relationships.append(Relationship(constraint.columns[0], constraint.relationship_to.fullname))
 
-        self.indexes = [AlchemicalIndex(index, self) for index in self._table.indexes]
+    def referred_table_keys(self) -> typing.Set[typing.Tuple[typing.Optional[str], str]]:
+        """The (schema, name) of every table the foreign keys of this table refer to."""
+
+        keys = set()
+        for foreign_key in self._table.foreign_keys:
+            schema, table_name, _ = foreign_key_target(foreign_key)
+            keys.add((schema, table_name))
+        return keys
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any], parent: "AlchemicalLab") -> "AlchemicalTable":
+        """Rebuild a table and its columns from the output of `to_dict`, without a SQLAlchemy table.
+
+        Constraints and indexes can refer to other tables, so they are only restored by `restore_constraints`,
+        once every table of the lab has been rebuilt.
+        """
+
+        table = cls.__new__(cls)
+        table._table = None
+        table.parent = parent
+        table.name = data["name"]
+        table.class_name = data["class_name"]
+        table.schema = data["schema"]
+        table.comment = data["comment"]
+        table.columns = [AlchemicalColumn.from_dict(column, table) for column in data["columns"]]
+        table._columns_by_name = {column.name: column for column in table.columns}
+        table.constraints = None
+        table.indexes = None
+        table.relationships = []
+        table.core_name = None
+        return table
+
+    def restore_constraints(self, data: typing.Dict[str, typing.Any]):
+        """Rebuild the constraints and indexes of a table created by `from_dict`."""
+
+        self.constraints = [AlchemicalConstraint.from_dict(constraint, self) for constraint in data["constraints"]]
+        self._compute_relationships()
+        self.indexes = [AlchemicalIndex.from_dict(index, self) for index in data["indexes"]]
+        self._compute_core_name()
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "class_name": self.class_name,
+            "schema": self.schema,
+            "comment": self.comment,
+            "columns": [column.to_dict() for column in self.columns],
+            "constraints": [constraint.to_dict() for constraint in self.constraints],
+            "indexes": [index.to_dict() for index in self.indexes],
+        }
+
+    def detach(self):
+        """Drop the references to the reflected SQLAlchemy objects, keeping only what `codegen` needs.
+        Must be called after `compute_properties`."""
+
+        self._table = None
+        for column in self.columns:
+            column.detach()
+        for constraint in self.constraints:
+            constraint.detach()
         for index in self.indexes:
-            index.compute_properties()
+            index.detach()
 
     @property
     def imports(self) -> typing.Dict[str, typing.Set[str]]:
         base_types = {"Column"}
         if len(self.indexes) > 0:
             base_types.add("Index")
-        column_types = {column.type_name for column in self.columns}
         constraint_types = {constraint.type for constraint in self.constraints}
         orm_imports = set()
         for constraint in self.constraints:
             if constraint.has_relationship:
                 orm_imports.add("relationship")
                 break
-        return { 
-            "sqlalchemy": base_types.union(column_types.union(constraint_types)), 
+        if any(column.deferred for column in self.columns):
+            orm_imports.add("deferred")
+        imports = { 
+            "sqlalchemy": base_types.union(constraint_types), 
             "sqlalchemy.orm": orm_imports 
         }
+        for column in self.columns:
+            for module, name in column.type_imports:
+                imports.setdefault(module, set()).add(name)
+        return imports
+
+    def structure(self) -> tuple:
+        """A hashable summary of this table's structure: its columns, constraints and indexes.
+
+        Constraints and indexes are unordered in SQLAlchemy, so their signatures are sorted first.
+        """
+
+        return (
+            self.schema,
+            self.name,
+            self.class_name,
+            self.comment,
+            tuple(column.signature() for column in self.columns),
+            tuple(sorted((constraint.signature() for constraint in self.constraints), key=repr)),
+            tuple(sorted((index.signature() for index in self.indexes), key=repr)),
+        )
+
+    def deferrals(self) -> tuple:
+        """The `deferral` of every column, in order."""
+
+        return tuple(column.deferral() for column in self.columns)
+
+    def loadings(self) -> tuple:
+        """The `loading` of every constraint, sorted like in `structure`."""
+
+        return tuple(loading for _, loading in sorted(((constraint.signature(), constraint.loading()) for constraint in self.constraints), key=repr))
+
+    def fingerprint(self) -> str:
+        """A stable hash of `structure`, which can be compared across processes."""
+
+        return hashlib.sha256(repr(self.structure()).encode()).hexdigest()
 
     def will_generate(self) -> bool:
         """Check if this table will generate any code."""
@@ -94,17 +242,15 @@ class AlchemicalTable:
     def codegen(self) -> typing.Dict[CodeLocation, str]:
         """Generate SQLAlchemy ORM code for this table."""
 
-        class_code = ""
-        after_class_code = ""
-
-        class_code =  f"class {self.class_name}(Base):\n"
-        class_code += f"    __tablename__ = {quoted_string(self.name)}\n"
+        # Modules are assembled out of parts, joined once at the end
+        class_code = [f"class {self.class_name}(Base):\n", f"    __tablename__ = {quoted_string(self.name)}\n"]
+        after_class_code = []
 
         table_args = {}
-        if self._table.comment is not None:
+        if self.comment is not None:
             table_args["comment"] = self.comment
-        if self._table.schema is not None:
-            table_args["schema"] = quoted_string(self._table.schema)
+        if self.schema is not None:
+            table_args["schema"] = quoted_string(self.schema)
 
         relationships = []
         relationship_tracker = set()
@@ -112,7 +258,7 @@ class AlchemicalTable:
 
         # Generate table arguments and constraints, if any
         if len(table_args) + len(self.constraints) > 0:
-            class_code += "    __table_args__ = (\n"
+            class_code.append("    __table_args__ = (\n")
 
             # Constraints come first
             if len(self.constraints) > 0:
@@ -126,7 +272,7 @@ class AlchemicalTable:
                     if constraint.type == "PrimaryKeyConstraint":
                         has_primary_key = True
 
-                    class_code += f"        {constraint_code},\n"
+                    class_code.append(f"        {constraint_code},\n")
                     if relationship_code is not None:
                         relationship_identifier = (constraint.referred_table.class_name, constraint.relationship_to.fullname)
                         if relationship_identifier not in relationship_tracker:
@@ -135,13 +281,13 @@ class AlchemicalTable:
 
             # Table arguments come next
             if len(table_args) > 0:
-                class_code += "        {\n"
+                class_code.append("        {\n")
                 for arg, value in table_args.items():
-                    class_code += f"            {quoted_string(arg)}: {value},\n"
-                class_code += "        },\n"
+                    class_code.append(f"            {quoted_string(arg)}: {value},\n")
+                class_code.append("        },\n")
 
-            class_code += "    )\n"
-        class_code += "\n"
+            class_code.append("    )\n")
+        class_code.append("\n")
 
         # Generate columns
         found_primary_key = has_primary_key
@@ -149,26 +295,66 @@ class AlchemicalTable:
             column_code = column.codegen(not has_primary_key)
             if column.implicit_primary_key:
                 found_primary_key = True
-            class_code += f"    {column_code}\n"
+            class_code.append(f"    {column_code}\n")
         if len(self.columns):
-            class_code += "\n"
+            class_code.append("\n")
 
         if not found_primary_key:
             raise NotImplementedError(f"Table {self.name} does not have a primary key constraint, and no suitable combination of columns could be found.")
         
         # Generate relationships
         for relationship in relationships:
-            class_code += f"    {relationship}\n"
+            class_code.append(f"    {relationship}\n")
         if len(relationships):
-            class_code += "\n"
+            class_code.append("\n")
 
         # Generate indexes
         for index in self.indexes:
-            after_class_code += f"{index.codegen()}\n"
+            after_class_code.append(f"{index.codegen()}\n")
         if len(self.indexes):
-            after_class_code += "\n"
+            after_class_code.append("\n")
 
-        return { "table": class_code, "end": after_class_code }
+        return { "table": "".join(class_code), "end": "".join(after_class_code) }
+
+    def codegen_core(self) -> str:
+        """Generate a SQLAlchemy Core `Table` for this table, bound to a `metadata` object. Unlike the ORM
+        class, the table doesn't need a primary key."""
+
+        code = [f"{self.core_name} = Table(\n", f"    {quoted_string(self.name)},\n", "    metadata,\n"]
+        for column in self.columns:
+            code.append(f"    {column.codegen_core()},\n")
+        for constraint in self.constraints:
+            constraint_code = constraint.codegen()
+            if constraint_code is not None:
+                code.append(f"    {constraint_code},\n")
+        for index in self.indexes:
+            code.append(f"    {index.codegen_core()},\n")
+        if self.comment is not None:
+            code.append(f"    comment={self.comment},\n")
+        if self.schema is not None:
+            code.append(f"    schema={quoted_string(self.schema)},\n")
+        code.append(")\n")
+        return "".join(code)
+
+    def _compute_core_name(self):
+        """Compute the variable the Core `Table` is assigned to: the table's name, unless it isn't an identifier, or
+        it would clash with a keyword, `metadata` or an imported name, in which case it gets a `_table` suffix."""
+
+        imported_names = {name for names in self.core_imports.values() for name in names}
+        self.core_name = python_identifier(self.name, _CORE_RESERVED_NAMES | imported_names, "_table")
+
+    @property
+    def core_imports(self) -> typing.Dict[str, typing.Set[str]]:
+        base_types = {"Column", "Table"}
+        if len(self.indexes) > 0:
+            base_types.add("Index")
+        # Constraints without columns, like the primary key of a table without one, generate nothing
+        constraint_types = {constraint.type for constraint in self.constraints if constraint.codegen() is not None}
+        imports = {"sqlalchemy": base_types.union(constraint_types)}
+        for column in self.columns:
+            for module, name in column.type_imports:
+                imports.setdefault(module, set()).add(name)
+        return imports
 
-    def column_from_name(self, name: str) -> AlchemicalColumn:
-        return next((column for column in self.columns if column.name == name), None)
+    def column_from_name(self, name: str) -> typing.Optional[AlchemicalColumn]:
+        return self._columns_by_name.get(name)
@@ -0,0 +1,102 @@
+import contextlib
+import dataclasses
+import typing
+
+if typing.TYPE_CHECKING:
+    from .alchemical_column import AlchemicalColumn
+    from .alchemical_lab import AlchemicalLab
+    from .alchemical_table import AlchemicalTable
+
+# Generic types whose values can be arbitrarily large
+LARGE_TYPES = frozenset({"Text", "UnicodeText", "LargeBinary", "JSON", "ARRAY", "PickleType"})
+# Generic types that are only large when they have no length, or a long one
+SIZED_TYPES = frozenset({"String", "Unicode"})
+
+Override = typing.Union[bool, str]
+
+
+@dataclasses.dataclass
+class DeferralPolicy:
+    """Decides which columns are generated with `deferred()`, so they are only loaded when accessed.
+
+    Columns of a large type (see `LARGE_TYPES`) are deferred, as are strings without a length or longer than
+    `max_length` characters. Deferred columns of a table are put in `group`, if given, so they can be loaded
+    together with `undefer_group`. `{table}` in the group name is replaced with the table's name.
+
+    `overrides` maps `"table.column"` to True (defer), False (never defer) or a group name (defer in that group),
+    and `"table"` to False (defer nothing in the table) or a group name (the group of its deferred columns).
+    Primary key columns are never deferred, and foreign key columns only when overridden.
+    """
+
+    max_length: typing.Optional[int] = 255
+    group: typing.Optional[str] = None
+    overrides: typing.Dict[str, Override] = dataclasses.field(default_factory=dict)
+
+    def is_large(self, column: "AlchemicalColumn") -> bool:
+        if column.type_name in LARGE_TYPES:
+            return True
+        if column.type_name in SIZED_TYPES:
+            return column.type_length is None or (self.max_length is not None and column.type_length > self.max_length)
+        return False
+
+    def _group(self, table: "AlchemicalTable", group: typing.Optional[str]) -> typing.Optional[str]:
+        return group.replace("{table}", table.name) if group is not None else None
+
+    def deferral(self, table: "AlchemicalTable", column: "AlchemicalColumn", key_columns: typing.Set[str]) -> typing.Tuple[bool, typing.Optional[str]]:
+        """Whether `column` should be deferred, and in which group."""
+
+        table_override = self.overrides.get(table.name)
+        if table_override is False:
+            return False, None
+        table_group = table_override if isinstance(table_override, str) else self.group
+
+        column_override = self.overrides.get(f"{table.name}.{column.name}")
+        if column_override is False:
+            return False, None
+        if column_override is None and (column.name in key_columns or not self.is_large(column)):
+            return False, None
+        group = column_override if isinstance(column_override, str) else table_group
+        return True, self._group(table, group)
+
+
+def _key_columns(table: "AlchemicalTable") -> typing.Tuple[typing.Set[str], typing.Set[str]]:
+    primary_key_columns, foreign_key_columns = set(), set()
+    for constraint in table.constraints:
+        if constraint.type == "PrimaryKeyConstraint":
+            primary_key_columns.update(column.name for column in constraint.columns)
+        elif constraint.type == "ForeignKeyConstraint":
+            foreign_key_columns.update(column.name for column in constraint.columns)
+    return primary_key_columns, foreign_key_columns
+
+def defer_table_columns(table: "AlchemicalTable", policy: DeferralPolicy):
+    """Set the `deferred` and `deferred_group` of every column of `table` according to `policy`."""
+
+    primary_key_columns, foreign_key_columns = _key_columns(table)
+    for column in table.columns:
+        if column.name in primary_key_columns:
+            column.deferred, column.deferred_group = False, None
+        else:
+            column.deferred, column.deferred_group = policy.deferral(table, column, foreign_key_columns)
+
+def defer_columns(lab: "AlchemicalLab", policy: DeferralPolicy):
+    """Set the `deferred` and `deferred_group` of every column of `lab` according to `policy`."""
+
+    for table in lab.tables:
+        defer_table_columns(table, policy)
+
+@contextlib.contextmanager
+def deferred_columns(lab: "AlchemicalLab", policy: typing.Optional[DeferralPolicy]) -> typing.Iterator[None]:
+    """Defer the columns of `lab` according to `policy` (if any) inside the `with` block only, restoring their
+    previous `deferred` and `deferred_group` afterwards."""
+
+    if policy is None:
+        yield
+        return
+
+    previous = [(column, column.deferred, column.deferred_group) for table in lab.tables for column in table.columns]
+    defer_columns(lab, policy)
+    try:
+        yield
+    finally:
+        for column, deferred, deferred_group in previous:
+            column.deferred, column.deferred_group = deferred, deferred_group
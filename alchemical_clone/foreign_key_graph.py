@@ -0,0 +1,66 @@
+import types
+import typing
+
+if typing.TYPE_CHECKING:
+    from .alchemical_constraint import AlchemicalConstraint
+    from .alchemical_table import AlchemicalTable
+
+
+class JunctionTable(typing.NamedTuple):
+    """A table with exactly two foreign keys, neither of them to itself, which may implement a many-to-many relationship."""
+
+    table: "AlchemicalTable"
+    left: "AlchemicalConstraint"
+    right: "AlchemicalConstraint"
+
+
+class ForeignKeyGraph:
+    """A read-only graph of the foreign keys between the tables of a lab.
+
+    It is built once, in a single pass over every table's constraints, and shared by all plugins.
+    """
+
+    def __init__(self, tables: typing.Iterable["AlchemicalTable"]):
+        outgoing: typing.Dict["AlchemicalTable", typing.List["AlchemicalConstraint"]] = {}
+        incoming: typing.Dict["AlchemicalTable", typing.List["AlchemicalConstraint"]] = {}
+        edge_counts: typing.Dict[typing.Tuple["AlchemicalTable", "AlchemicalTable"], int] = {}
+        self_references: typing.List["AlchemicalConstraint"] = []
+        junction_candidates: typing.List[JunctionTable] = []
+
+        for table in tables:
+            constraints = [constraint for constraint in table.constraints if constraint.type == "ForeignKeyConstraint"]
+            outgoing[table] = constraints
+            for constraint in constraints:
+                referred_table = constraint.referred_table
+                incoming.setdefault(referred_table, []).append(constraint)
+                edge_counts[(table, referred_table)] = edge_counts.get((table, referred_table), 0) + 1
+                if referred_table == table:
+                    self_references.append(constraint)
+
+            if len(constraints) == 2 and all(constraint.referred_table != table for constraint in constraints):
+                junction_candidates.append(JunctionTable(table, constraints[0], constraints[1]))
+
+        self._outgoing = types.MappingProxyType({table: tuple(constraints) for table, constraints in outgoing.items()})
+        self._incoming = types.MappingProxyType({table: tuple(constraints) for table, constraints in incoming.items()})
+        self._edge_counts = types.MappingProxyType(edge_counts)
+        self.self_references: typing.Tuple["AlchemicalConstraint", ...] = tuple(self_references)
+        self.junction_candidates: typing.Tuple[JunctionTable, ...] = tuple(junction_candidates)
+
+    def outgoing(self, table: "AlchemicalTable") -> typing.Tuple["AlchemicalConstraint", ...]:
+        """The foreign keys of `table`, in the order of its constraints."""
+
+        return self._outgoing.get(table, ())
+
+    def incoming(self, table: "AlchemicalTable") -> typing.Tuple["AlchemicalConstraint", ...]:
+        """The foreign keys of other tables (or of `table` itself) that refer to `table`."""
+
+        return self._incoming.get(table, ())
+
+    def edge_count(self, from_: "AlchemicalTable", to: "AlchemicalTable") -> int:
+        """How many foreign keys of `from_` refer to `to`."""
+
+        return self._edge_counts.get((from_, to), 0)
+
+    @property
+    def edge_counts(self) -> typing.Mapping[typing.Tuple["AlchemicalTable", "AlchemicalTable"], int]:
+        return self._edge_counts
@@ -2,6 +2,9 @@ import dataclasses
 import typing
 
 
+# Bump whenever the generated code changes, so that incremental clones are regenerated
+GENERATOR_VERSION = "0.0.2"
+
 CodeLocation = typing.Literal["table", "end"]
 
 @dataclasses.dataclass
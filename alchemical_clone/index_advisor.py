@@ -0,0 +1,202 @@
+import dataclasses
+import json
+import typing
+
+from .alchemical_table import AlchemicalTable
+
+if typing.TYPE_CHECKING:
+    from .alchemical_constraint import AlchemicalConstraint
+    from .alchemical_lab import AlchemicalLab
+
+
+@dataclasses.dataclass
+class IndexFinding:
+    """An index that is missing or redundant."""
+
+    # "unindexed_foreign_key", "duplicate_index", "prefix_index" or "junction_index"
+    kind: str
+    table: str
+    # The foreign key or index the finding is about
+    name: typing.Optional[str]
+    columns: typing.List[str]
+    detail: str
+    suggestion: str
+
+    def describe(self) -> str:
+        return f"{self.kind} on {self.table} ({', '.join(self.columns)}): {self.detail}. {self.suggestion}"
+
+
+@dataclasses.dataclass
+class IndexReport:
+    """Every finding of `advise_indexes`, table by table."""
+
+    findings: typing.List[IndexFinding] = dataclasses.field(default_factory=list)
+
+    def _findings(self, kind: str) -> typing.List[IndexFinding]:
+        return [finding for finding in self.findings if finding.kind == kind]
+
+    @property
+    def unindexed_foreign_keys(self) -> typing.List[IndexFinding]:
+        return self._findings("unindexed_foreign_key")
+
+    @property
+    def redundant_indexes(self) -> typing.List[IndexFinding]:
+        return self._findings("duplicate_index") + self._findings("prefix_index")
+
+    @property
+    def junction_indexes(self) -> typing.List[IndexFinding]:
+        return self._findings("junction_index")
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.findings) == 0
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {"findings": [dataclasses.asdict(finding) for finding in self.findings]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=4)
+
+    def report(self) -> str:
+        """A human-readable summary of the findings."""
+
+        lines = [finding.describe() for finding in self.findings]
+        lines.append(
+            f"{len(self.unindexed_foreign_keys)} unindexed foreign keys, {len(self.redundant_indexes)} redundant indexes, "
+            f"{len(self.junction_indexes)} missing junction indexes"
+        )
+        return "\n".join(lines)
+
+
+class _Key(typing.NamedTuple):
+    # An index, or a primary key or unique constraint, which most databases back with an index
+    name: typing.Optional[str]
+    columns: typing.Tuple[str, ...]
+    unique: bool
+    # "Index", "PrimaryKeyConstraint" or "UniqueConstraint"
+    type: str
+
+    @property
+    def is_index(self) -> bool:
+        return self.type == "Index"
+
+    def describe(self) -> str:
+        if self.name is not None:
+            return self.name
+        return {"PrimaryKeyConstraint": "the primary key", "UniqueConstraint": "a unique constraint"}.get(self.type, "an index")
+
+def _fullname(table: AlchemicalTable) -> str:
+    return f"{table.schema}.{table.name}" if table.schema is not None else table.name
+
+def _keys(table: AlchemicalTable) -> typing.List[_Key]:
+    keys = []
+    for constraint in table.constraints:
+        if constraint.type in ("PrimaryKeyConstraint", "UniqueConstraint") and len(constraint.columns) > 0:
+            keys.append(_Key(constraint.name, tuple(column.name for column in constraint.columns), True, constraint.type))
+    for index in table.indexes:
+        # Indexes on expressions can't be compared column by column
+        if not index.has_expressions:
+            keys.append(_Key(index.name, tuple(column.name for column in index.columns), bool(index.unique), "Index"))
+    return keys
+
+def _covers(key: _Key, columns: typing.Tuple[str, ...]) -> bool:
+    """Whether `columns`, in any order, are the leading columns of `key`."""
+
+    return len(key.columns) >= len(columns) and set(key.columns[:len(columns)]) == set(columns)
+
+def _create_index(table: AlchemicalTable, columns: typing.Sequence[str]) -> str:
+    return f"CREATE INDEX ix_{table.name}_{'_'.join(columns)} ON {_fullname(table)} ({', '.join(columns)})"
+
+def _foreign_key_columns(constraint: "AlchemicalConstraint") -> typing.Tuple[str, ...]:
+    return tuple(column.name for column in constraint.columns)
+
+def _unindexed_foreign_keys(table: AlchemicalTable, keys: typing.List[_Key]) -> typing.List[IndexFinding]:
+    findings = []
+    for constraint in table.constraints:
+        if constraint.type != "ForeignKeyConstraint":
+            continue
+        columns = _foreign_key_columns(constraint)
+        if any(_covers(key, columns) for key in keys):
+            continue
+        usage = "joined by a generated relationship" if constraint.has_relationship else "used in joins"
+        findings.append(IndexFinding(
+            "unindexed_foreign_key",
+            _fullname(table),
+            constraint.name,
+            list(columns),
+            f"foreign key to {_fullname(constraint.referred_table)} is {usage}, but no index starts with its columns",
+            _create_index(table, columns),
+        ))
+    return findings
+
+def _keeps(other: _Key, other_position: int, key: _Key, position: int) -> bool:
+    """Of two keys with the same columns, whether `other` is the one to keep: the unique one, a constraint
+    rather than an index, or else the first one."""
+
+    if other.unique != key.unique:
+        return other.unique
+    return not other.is_index or other_position < position
+
+def _redundant_indexes(table: AlchemicalTable, keys: typing.List[_Key]) -> typing.List[IndexFinding]:
+    findings = []
+    for i, key in enumerate(keys):
+        if not key.is_index:
+            continue
+        for j, other in enumerate(keys):
+            if i == j:
+                continue
+            if other.columns == key.columns:
+                if _keeps(other, j, key, i):
+                    findings.append(IndexFinding(
+                        "duplicate_index",
+                        _fullname(table),
+                        key.name,
+                        list(key.columns),
+                        f"has the same columns as {other.describe()}",
+                        f"DROP INDEX {key.name}",
+                    ))
+                    break
+            elif not key.unique and other.columns[:len(key.columns)] == key.columns:
+                findings.append(IndexFinding(
+                    "prefix_index",
+                    _fullname(table),
+                    key.name,
+                    list(key.columns),
+                    f"its columns are a prefix of {other.describe()} ({', '.join(other.columns)})",
+                    f"DROP INDEX {key.name}",
+                ))
+                break
+    return findings
+
+def _junction_indexes(table: AlchemicalTable, keys: typing.List[_Key], left: "AlchemicalConstraint", right: "AlchemicalConstraint") -> typing.List[IndexFinding]:
+    findings = []
+    for first, second in ((left, right), (right, left)):
+        columns = _foreign_key_columns(first) + _foreign_key_columns(second)
+        if any(key.columns[:len(columns)] == columns for key in keys):
+            continue
+        findings.append(IndexFinding(
+            "junction_index",
+            _fullname(table),
+            first.name,
+            list(columns),
+            f"many-to-many lookups from {_fullname(first.referred_table)} have no composite index",
+            _create_index(table, columns),
+        ))
+    return findings
+
+def advise_indexes(lab: "AlchemicalLab") -> IndexReport:
+    """Check the indexes of every table of `lab` against its foreign keys and the relationships generated for them.
+
+    Reports foreign keys whose columns don't lead any index (or primary key or unique constraint), indexes that
+    duplicate another index or constraint or are a prefix of another index, and the junction tables of
+    many-to-many relationships without a composite index starting from each side.
+    """
+
+    keys = {table: _keys(table) for table in lab.tables}
+    findings = []
+    for table in lab.tables:
+        findings.extend(_unindexed_foreign_keys(table, keys[table]))
+        findings.extend(_redundant_indexes(table, keys[table]))
+    for junction in lab.foreign_key_graph.junction_candidates:
+        findings.extend(_junction_indexes(junction.table, keys[junction.table], junction.left, junction.right))
+    return IndexReport(findings)
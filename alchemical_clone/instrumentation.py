@@ -0,0 +1,130 @@
+import dataclasses
+import threading
+import time
+import tracemalloc
+import typing
+
+
+@dataclasses.dataclass
+class InstrumentationEvent:
+    """A measurement of one phase of a clone, optionally for a single table or plugin."""
+
+    phase: str
+    name: typing.Optional[str]
+    duration: float
+    count: typing.Optional[int] = None
+    # Only available while tracemalloc is tracing
+    memory_delta: typing.Optional[int] = None
+
+
+Observer = typing.Callable[[InstrumentationEvent], None]
+
+
+class _NullMeasurement:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullMeasurement":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    @property
+    def count(self) -> None:
+        return None
+
+    @count.setter
+    def count(self, value: int):
+        pass
+
+
+class _Measurement:
+    __slots__ = ("_observer", "_phase", "_name", "_start", "_memory", "count")
+
+    def __init__(self, observer: Observer, phase: str, name: typing.Optional[str]):
+        self._observer = observer
+        self._phase = phase
+        self._name = name
+        self._start = None
+        self._memory = None
+        self.count = None
+
+    def __enter__(self) -> "_Measurement":
+        if tracemalloc.is_tracing():
+            self._memory = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        duration = time.perf_counter() - self._start
+        memory_delta = tracemalloc.get_traced_memory()[0] - self._memory if self._memory is not None and tracemalloc.is_tracing() else None
+        self._observer(InstrumentationEvent(self._phase, self._name, duration, self.count, memory_delta))
+        return False
+
+
+_NULL_MEASUREMENT = _NullMeasurement()
+
+
+def measure(observer: typing.Optional[Observer], phase: str, name: typing.Optional[str] = None) -> typing.Union[_Measurement, _NullMeasurement]:
+    """Context manager that reports how long its body took to `observer`. The `count` attribute of the
+    returned object can be set to report how many items were processed.
+
+    Without an observer, a shared no-op context manager is returned.
+    """
+
+    if observer is None:
+        return _NULL_MEASUREMENT
+    return _Measurement(observer, phase, name)
+
+
+class SummaryReporter:
+    """An observer that collects every event, and summarizes where the time went."""
+
+    TABLE_PHASES = ("compute_properties", "codegen", "write")
+
+    def __init__(self):
+        self.events: typing.List[InstrumentationEvent] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: InstrumentationEvent):
+        # Tables can be generated by several threads at once
+        with self._lock:
+            self.events.append(event)
+
+    def phase_totals(self) -> typing.Dict[str, float]:
+        """Total time spent in each phase."""
+
+        totals: typing.Dict[str, float] = {}
+        for event in self.events:
+            totals[event.phase] = totals.get(event.phase, 0) + event.duration
+        return totals
+
+    def slowest(self, phases: typing.Iterable[str], limit: int = 10) -> typing.List[typing.Tuple[str, float]]:
+        """The names with the largest total time across `phases`, slowest first."""
+
+        phases = set(phases)
+        totals: typing.Dict[str, float] = {}
+        for event in self.events:
+            if event.phase in phases and event.name is not None:
+                totals[event.name] = totals.get(event.name, 0) + event.duration
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def slowest_tables(self, limit: int = 10) -> typing.List[typing.Tuple[str, float]]:
+        return self.slowest(self.TABLE_PHASES, limit)
+
+    def slowest_plugins(self, limit: int = 10) -> typing.List[typing.Tuple[str, float]]:
+        return self.slowest(("plugin",), limit)
+
+    def report(self, limit: int = 10) -> str:
+        """A human-readable summary of the phases, and of the slowest tables and plugins."""
+
+        lines = ["Phases:"]
+        for phase, duration in sorted(self.phase_totals().items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"    {phase:<24}{duration:>10.4f}s")
+        lines.append("Slowest tables:")
+        for name, duration in self.slowest_tables(limit):
+            lines.append(f"    {name:<40}{duration:>10.4f}s")
+        lines.append("Slowest plugins:")
+        for name, duration in self.slowest_plugins(limit):
+            lines.append(f"    {name:<40}{duration:>10.4f}s")
+        return "\n".join(lines)
@@ -0,0 +1,187 @@
+import hashlib
+import re
+import typing
+
+from sqlalchemy import Engine, MetaData
+from sqlalchemy.schema import BLANK_SCHEMA
+
+from .alchemical_lab import AlchemicalLab, Plugin, _write_module
+from .instrumentation import Observer, measure
+from .output import (OutputSink, PathLike, incremental_output_sink,
+                     output_sink)
+from .reflection import reflect
+from .reflection.catalog import catalog_foreign_keys, catalog_signature
+from .utils import quoted_string
+
+_SCHEMAS_INIT_FUNCTIONS_CODE = """\
+def models(schema):
+    \"\"\"The module with the models of `schema`.\"\"\"
+
+    return importlib.import_module(f".{SCHEMAS[schema]}", __name__)
+
+
+def schema_translate_map(schema):
+    \"\"\"Maps the tables of the models, which have no schema, to `schema`.\"\"\"
+
+    return {None: schema}
+
+
+def for_schema(connectable, schema):
+    \"\"\"A copy of `connectable` (an engine or connection) that runs statements on the models against `schema`.\"\"\"
+
+    return connectable.execution_options(schema_translate_map=schema_translate_map(schema))
+"""
+
+_SHAPE_FUNCTIONS_CODE = """\
+def __getattr__(name):
+    package_name = _PACKAGES.get(name)
+    if package_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    model = getattr(importlib.import_module(f".{package_name}", __package__), name)
+    globals()[name] = model
+    return model
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PACKAGES))
+"""
+
+
+def _hash(value: typing.Any) -> str:
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+def schema_shape(engine: Engine, schema: typing.Optional[str] = None) -> str:
+    """A hash of the structure of every table of `schema`. Schemas with the same tables have the same shape,
+    whatever their names are."""
+
+    return _hash(sorted(catalog_signature(engine, schema).items()))
+
+def _components(signature: typing.Dict[str, str], foreign_keys: typing.Dict[str, typing.Set[str]]) -> typing.List[typing.List[str]]:
+    """The groups of tables of a schema connected by foreign keys, each sorted by name."""
+
+    parents = {table_name: table_name for table_name in signature}
+
+    def find(table_name: str) -> str:
+        while parents[table_name] != table_name:
+            parents[table_name] = parents[parents[table_name]]
+            table_name = parents[table_name]
+        return table_name
+
+    for table_name, referred_tables in foreign_keys.items():
+        for referred_table in referred_tables:
+            if table_name in parents and referred_table in parents:
+                parents[find(referred_table)] = find(table_name)
+
+    components: typing.Dict[str, typing.List[str]] = {}
+    for table_name in sorted(signature):
+        components.setdefault(find(table_name), []).append(table_name)
+    return list(components.values())
+
+def _schemaless_metadata(metadata: MetaData, schema: typing.Optional[str], table_names: typing.Iterable[str]) -> MetaData:
+    """A copy of the `table_names` tables of `schema` in `metadata`, in which they, and the foreign keys that
+    refer to them, have no schema."""
+
+    def referred_schema_fn(table, to_schema, constraint, referred_schema):
+        return BLANK_SCHEMA if referred_schema == schema else referred_schema
+
+    schemaless_metadata = MetaData()
+    for table_name in table_names:
+        table = metadata.tables[f"{schema}.{table_name}" if schema is not None else table_name]
+        table.to_metadata(schemaless_metadata, schema=None, referred_schema_fn=referred_schema_fn)
+    return schemaless_metadata
+
+def _shape_module_code(models: typing.Dict[str, str]) -> str:
+    parts = ["__all__ = [\n"]
+    for class_name in sorted(models):
+        parts.append(f"    {quoted_string(class_name)},\n")
+    parts.append("]\n\n")
+    parts.append("import importlib\n\n")
+    parts.append("_PACKAGES = {\n")
+    for class_name, package_name in sorted(models.items()):
+        parts.append(f"    {quoted_string(class_name)}: {quoted_string(package_name)},\n")
+    parts.append("}\n\n\n")
+    parts.append(_SHAPE_FUNCTIONS_CODE)
+    return "".join(parts)
+
+def _schemas_init_module_code(shapes: typing.Dict[str, str]) -> str:
+    parts = ['__all__ = ["SCHEMAS", "SHAPES", "for_schema", "models", "schema_translate_map"]\n\n']
+    parts.append("import importlib\n\n")
+    parts.append("SHAPES = (\n")
+    for shape in sorted(set(shapes.values())):
+        parts.append(f"    {quoted_string(shape)},\n")
+    parts.append(")\n\n")
+    parts.append("SCHEMAS = {\n")
+    for schema, shape in shapes.items():
+        parts.append(f"    {quoted_string(schema)}: {quoted_string(shape)},\n")
+    parts.append("}\n\n\n")
+    parts.append(_SCHEMAS_INIT_FUNCTIONS_CODE)
+    return "".join(parts)
+
+def clone_schemas(
+        engine: Engine,
+        schemas: typing.Iterable[str],
+        directory: typing.Union[PathLike, OutputSink],
+        plugins: typing.Optional[typing.List[Plugin]] = None,
+        workers: int = 4,
+        bulk: bool = True,
+        incremental: bool = False,
+        jobs: int = 1,
+        lazy: bool = False,
+        observer: typing.Optional[Observer] = None,
+    ) -> typing.Dict[str, str]:
+    """Clone many schemas with mostly the same tables (e.g. one per tenant), generating every table only once.
+
+    The tables of every schema are grouped with the tables their foreign keys connect them to, and every group is
+    identified by a hash of the structure of its tables, read from the catalog only. Each distinct group is reflected
+    from the first schema it appears in, and generated once, without a schema, in its own `component_<hash>`
+    subpackage. Relationships never leave a group, so the groups of a schema don't need to be generated together,
+    and a schema with one changed table only costs the group of that table.
+
+    Every distinct set of tables gets a `shape_<hash>` module, which exports the models of its groups. The package's
+    `__init__.py` maps every schema to its shape, and `for_schema(engine, schema)` returns an engine whose
+    statements on the models run against that schema.
+
+    Returns the shape module of every schema.
+    """
+
+    sink = incremental_output_sink(directory) if incremental else output_sink(directory)
+    with measure(observer, "clone_schemas") as measurement:
+        shapes: typing.Dict[str, str] = {}
+        shape_components: typing.Dict[str, typing.List[str]] = {}
+        representatives: typing.Dict[str, typing.Tuple[str, typing.List[str]]] = {}
+        for schema in schemas:
+            with measure(observer, "schema_shape", schema):
+                signature = catalog_signature(engine, schema)
+            shape = f"shape_{_hash(sorted(signature.items()))[:12]}"
+            shapes[schema] = shape
+            if shape in shape_components:
+                continue
+            shape_components[shape] = []
+            for table_names in _components(signature, catalog_foreign_keys(engine, schema)):
+                component = f"component_{_hash([(name, signature[name]) for name in table_names])[:12]}"
+                representatives.setdefault(component, (schema, table_names))
+                shape_components[shape].append(component)
+
+        components_by_schema: typing.Dict[str, typing.List[str]] = {}
+        for component, (schema, _) in representatives.items():
+            components_by_schema.setdefault(schema, []).append(component)
+
+        models: typing.Dict[str, typing.Dict[str, str]] = {}
+        for schema, components in components_by_schema.items():
+            table_names = [name for component in components for name in representatives[component][1]]
+            with measure(observer, "reflection", schema) as reflection_measurement:
+                include = [re.compile(re.escape(name)) for name in table_names]
+                metadata = reflect(engine, schema=schema, workers=workers, bulk=bulk, include=include)
+                reflection_measurement.count = len(metadata.tables)
+            for component in components:
+                component_metadata = _schemaless_metadata(metadata, schema, representatives[component][1])
+                lab = AlchemicalLab(component_metadata, detach=True, observer=observer)
+                generated_tables = lab.create_clone(sink.child(component), plugins=plugins, incremental=incremental, jobs=jobs, lazy=lazy)
+                models[component] = {table.class_name: component for table in generated_tables}
+
+        for shape, components in shape_components.items():
+            shape_models = {class_name: package for component in components for class_name, package in models[component].items()}
+            _write_module(sink, f"{shape}.py", _shape_module_code(shape_models), incremental)
+        _write_module(sink, "__init__.py", _schemas_init_module_code(shapes), incremental)
+        measurement.count = len(representatives)
+    return shapes
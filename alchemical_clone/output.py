@@ -0,0 +1,192 @@
+import os
+import posixpath
+import threading
+import typing
+import zipfile
+
+PathLike = typing.Union[str, bytes, os.PathLike]
+
+
+class OutputSink:
+    """Where the modules of a clone are written. Paths are relative to the root of the sink and use `/` as
+    their separator. Every module is written with a single call, once it has been fully generated."""
+
+    # Whether `remove` works, which incremental clones need to delete the modules of tables that no longer exist
+    supports_remove = True
+
+    def read(self, path: str) -> typing.Optional[str]:
+        """The contents of a module written before, or None if there is no such module."""
+
+        raise NotImplementedError
+
+    def write(self, path: str, code: str):
+        raise NotImplementedError
+
+    def remove(self, path: str):
+        raise NotImplementedError
+
+    def exists(self, path: str) -> bool:
+        return self.read(path) is not None
+
+    def child(self, path: str) -> "OutputSink":
+        """A view of this sink rooted at `path`, e.g. for a subpackage."""
+
+        return _ChildSink(self, path)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _ChildSink(OutputSink):
+    def __init__(self, parent: OutputSink, root: str):
+        self.parent = parent
+        self.root = root
+
+    def read(self, path: str) -> typing.Optional[str]:
+        return self.parent.read(posixpath.join(self.root, path))
+
+    def write(self, path: str, code: str):
+        self.parent.write(posixpath.join(self.root, path), code)
+
+    def remove(self, path: str):
+        self.parent.remove(posixpath.join(self.root, path))
+
+    def exists(self, path: str) -> bool:
+        return self.parent.exists(posixpath.join(self.root, path))
+
+    @property
+    def supports_remove(self) -> bool:
+        return self.parent.supports_remove
+
+
+class DirectorySink(OutputSink):
+    """Writes modules to `directory`. With `atomic` set, every module is written to a temporary file next to it,
+    which then replaces it, so an interrupted clone never leaves a half-written module behind. Only modules are
+    replaced atomically: an interrupted clone can still leave a package with some modules of the new clone and
+    some of the previous one."""
+
+    def __init__(self, directory: PathLike, atomic: bool = True):
+        self.directory = os.fsdecode(directory)
+        self.atomic = atomic
+        self._directories: typing.Set[str] = set()
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.directory, *path.split("/"))
+
+    def read(self, path: str) -> typing.Optional[str]:
+        try:
+            with open(self._path(path), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: str, code: str):
+        full_path = self._path(path)
+        directory = os.path.dirname(full_path)
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+
+        data = code.encode("utf-8")
+        if not self.atomic:
+            with open(full_path, "wb") as f:
+                f.write(data)
+            return
+
+        temporary_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                f.write(data)
+            os.replace(temporary_path, full_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def remove(self, path: str):
+        try:
+            os.remove(self._path(path))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(self._path(path))
+
+
+class MemorySink(OutputSink):
+    """Keeps the modules in the `files` dictionary, keyed by path, e.g. for tests or to embed a clone."""
+
+    def __init__(self, files: typing.Optional[typing.Dict[str, str]] = None):
+        self.files: typing.Dict[str, str] = files if files is not None else {}
+
+    def read(self, path: str) -> typing.Optional[str]:
+        return self.files.get(path)
+
+    def write(self, path: str, code: str):
+        self.files[path] = code
+
+    def remove(self, path: str):
+        self.files.pop(path, None)
+
+
+class ZipSink(OutputSink):
+    """Streams the modules into a new zip archive at `path` (a path or a writable binary file), under the `root`
+    directory. Adding the archive to `sys.path` makes the package importable.
+
+    The archive is only complete once the sink is closed. Zip archives can't be modified, so modules can't be
+    removed (and incremental clones can't be written to one), and a module written twice is stored twice, the last
+    copy taking precedence.
+    """
+
+    supports_remove = False
+
+    def __init__(
+            self,
+            path: typing.Union[PathLike, typing.BinaryIO],
+            root: str = "",
+            compression: int = zipfile.ZIP_DEFLATED,
+        ):
+        self.root = root
+        self._zip_file = zipfile.ZipFile(path, "w", compression=compression)
+        self._names: typing.Set[str] = set()
+        self._lock = threading.Lock()
+
+    def read(self, path: str) -> typing.Optional[str]:
+        # Modules are only written once they are complete, and the archive starts empty, so there is never
+        # anything to compare a module with
+        return None
+
+    def write(self, path: str, code: str):
+        with self._lock:
+            self._zip_file.writestr(posixpath.join(self.root, path), code)
+            self._names.add(path)
+
+    def remove(self, path: str):
+        raise NotImplementedError("Modules can't be removed from a zip archive.")
+
+    def exists(self, path: str) -> bool:
+        return path in self._names
+
+    def close(self):
+        with self._lock:
+            self._zip_file.close()
+
+
+def output_sink(output: typing.Union[PathLike, OutputSink]) -> OutputSink:
+    """`output` itself if it is a sink, or a `DirectorySink` writing to it otherwise."""
+
+    return output if isinstance(output, OutputSink) else DirectorySink(output)
+
+def incremental_output_sink(output: typing.Union[PathLike, OutputSink]) -> OutputSink:
+    """Like `output_sink`, for an incremental clone. Raises ValueError if the sink can't remove modules."""
+
+    sink = output_sink(output)
+    if not sink.supports_remove:
+        raise ValueError("Incremental clones need a sink that can remove modules, such as a directory (modules can't be removed from a zip archive).")
+    return sink
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+import types
+import typing
+
+from .generated_code import GENERATOR_VERSION, GeneratedCode
+
+if typing.TYPE_CHECKING:
+    from .alchemical_lab import Plugin, PluginResult
+
+
+def _constant_identity(constant: typing.Any) -> typing.Any:
+    if isinstance(constant, types.CodeType):
+        return _code_identity(constant)
+    if isinstance(constant, frozenset):
+        # The order of a set changes from one interpreter to the next
+        return tuple(sorted(repr(item) for item in constant))
+    if isinstance(constant, tuple):
+        return tuple(_constant_identity(item) for item in constant)
+    return repr(constant)
+
+def _code_identity(code: types.CodeType) -> typing.Tuple[typing.Any, ...]:
+    """The bytecode of `code` with its constants (including nested functions) and the names it uses."""
+
+    return (code.co_code, tuple(_constant_identity(constant) for constant in code.co_consts), code.co_names)
+
+def _function_identity(function: types.FunctionType, visited: typing.Set[types.FunctionType]) -> typing.Tuple[typing.Any, ...]:
+    """The code of `function`, the values it closes over and, recursively, the functions of its own module it calls."""
+
+    visited.add(function)
+    closure = tuple(
+        _function_identity(cell.cell_contents, visited) if isinstance(cell.cell_contents, types.FunctionType) else repr(cell.cell_contents)
+        for cell in function.__closure__ or ()
+    )
+    helpers = []
+    for name in function.__code__.co_names:
+        helper = function.__globals__.get(name)
+        if isinstance(helper, types.FunctionType) and helper.__module__ == function.__module__ and helper not in visited:
+            helpers.append((name, _function_identity(helper, visited)))
+    return (_code_identity(function.__code__), closure, tuple(helpers))
+
+def plugin_identity(plugin: "Plugin") -> str:
+    """A string that changes whenever the plugin might produce a different result for the same lab.
+
+    It includes the plugin's qualified name, its `version` attribute if it has one and, for plain functions, a hash
+    of their code: bytecode, constants, names, closure values and the functions of the same module they call.
+    Plugins that depend on anything else (e.g. helpers from other modules or files) should declare a `version`.
+    """
+
+    name = f"{getattr(plugin, '__module__', '')}.{getattr(plugin, '__qualname__', repr(plugin))}"
+    code_hash = None
+    if isinstance(plugin, types.FunctionType):
+        code_hash = hashlib.sha256(repr(_function_identity(plugin, set())).encode()).hexdigest()
+    return repr((name, getattr(plugin, "version", None), code_hash, GENERATOR_VERSION))
+
+
+def _serialize(result: "PluginResult") -> typing.Dict[str, typing.Any]:
+    return {
+        "imports": {
+            table: [{"package": item.package, "modules": sorted(item.modules)} for item in imports]
+            for table, imports in result.imports.items()
+        },
+        "code": {
+            table: [{"code": segment.code, "location": segment.location} for segment in code]
+            for table, code in result.code.items()
+        },
+    }
+
+def _deserialize(data: typing.Dict[str, typing.Any]) -> "PluginResult":
+    from .alchemical_lab import PluginImport, PluginResult
+
+    return PluginResult(
+        imports={
+            table: [PluginImport(item["package"], set(item["modules"])) for item in imports]
+            for table, imports in data["imports"].items()
+        },
+        code={
+            table: [GeneratedCode(segment["code"], segment["location"]) for segment in code]
+            for table, code in data["code"].items()
+        },
+    )
+
+
+class PluginCache:
+    """An on-disk cache of plugin results, keyed by the plugin's identity and the fingerprint of the lab.
+
+    Entries are evicted least-recently-used first whenever the cache grows past `max_bytes` or `max_entries`.
+    """
+
+    def __init__(
+            self,
+            directory: typing.Union[str, os.PathLike],
+            max_bytes: typing.Optional[int] = 256 * 1024 * 1024,
+            max_entries: typing.Optional[int] = None,
+        ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _plugin_prefix(self, plugin: "Plugin") -> str:
+        return hashlib.sha256(plugin_identity(plugin).encode()).hexdigest()[:32]
+
+    def _path(self, plugin: "Plugin", lab_fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{self._plugin_prefix(plugin)}-{lab_fingerprint[:32]}.json")
+
+    def _entries(self) -> typing.List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".json")]
+
+    def get(self, plugin: "Plugin", lab_fingerprint: str) -> typing.Optional["PluginResult"]:
+        """Return the cached result of `plugin` for a lab with this fingerprint, if there is one."""
+
+        path = self._path(plugin, lab_fingerprint)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch the entry, so eviction removes the least recently used entries first
+        os.utime(path)
+        return _deserialize(data)
+
+    def put(self, plugin: "Plugin", lab_fingerprint: str, result: "PluginResult"):
+        """Store the result of `plugin` for a lab with this fingerprint, evicting old entries if needed."""
+
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(_serialize(result), f, separators=(",", ":"))
+        os.replace(temporary_path, self._path(plugin, lab_fingerprint))
+        self._evict()
+
+    def invalidate(self, plugin: typing.Optional["Plugin"] = None):
+        """Remove the cached results of `plugin`, or every cached result if no plugin is given."""
+
+        prefix = self._plugin_prefix(plugin) + "-" if plugin is not None else ""
+        for entry in self._entries():
+            if entry.name.startswith(prefix):
+                os.remove(entry.path)
+
+    def _evict(self):
+        entries = sorted(((entry, entry.stat()) for entry in self._entries()), key=lambda item: item[1].st_mtime)
+        total_bytes = sum(stat.st_size for _, stat in entries)
+        while len(entries) > 0 and (
+            (self.max_bytes is not None and total_bytes > self.max_bytes)
+            or (self.max_entries is not None and len(entries) > self.max_entries)
+        ):
+            entry, stat = entries.pop(0)
+            os.remove(entry.path)
+            total_bytes -= stat.st_size
@@ -0,0 +1,152 @@
+__all__ = [
+    "BULK_REFLECTORS",
+    "reflect",
+    "reflect_async",
+    "reflect_batches",
+    "reflect_metadata",
+    "reflect_selection",
+    "reflect_selection_async",
+    "reflect_sqlite_metadata",
+    "select_table_names",
+]
+
+import asyncio
+import collections
+import concurrent.futures
+import typing
+
+from sqlalchemy import Connection, Engine, MetaData, inspect
+
+from .generic import (_batches, _reflect_batch, _reflect_connection_batch,
+                      reflect_metadata)
+from .selection import (TablePatterns, reflect_selection,
+                        reflect_selection_async, select_table_names)
+from .sqlite import reflect_sqlite_metadata
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+BulkReflector = typing.Callable[[typing.Union[Engine, Connection], typing.Optional[str], typing.Optional[typing.List[str]]], MetaData]
+
+# Dialects for which the whole schema can be read with a handful of catalog queries
+BULK_REFLECTORS: typing.Dict[str, BulkReflector] = {
+    "sqlite": reflect_sqlite_metadata,
+}
+
+
+def _merge(batch_metadatas: typing.Iterable[MetaData]) -> MetaData:
+    metadata = MetaData()
+    for batch_metadata in batch_metadatas:
+        for table in batch_metadata.tables.values():
+            table.to_metadata(metadata)
+    return metadata
+
+def reflect(
+        engine: Engine, 
+        schema: typing.Optional[str] = None, 
+        workers: int = 4, 
+        bulk: bool = True,
+        include: typing.Optional[TablePatterns] = None,
+        exclude: typing.Optional[TablePatterns] = None,
+        fk_depth: typing.Optional[int] = None,
+    ) -> MetaData:
+    """Reflect a database schema, using the bulk catalog reflector for the engine's dialect if there is one, 
+    and falling back to concurrent generic reflection otherwise.
+
+    If `include` or `exclude` patterns are given, only the matching tables are reflected, along with the tables
+    their foreign keys refer to, up to `fk_depth` levels away (all of them by default).
+    """
+
+    reflector = BULK_REFLECTORS.get(engine.dialect.name) if bulk else None
+    if reflector is not None:
+        reflect_tables = lambda table_names: reflector(engine, schema, table_names)
+    else:
+        reflect_tables = lambda table_names: reflect_metadata(engine, schema=schema, workers=workers, table_names=table_names)
+
+    if include is None and exclude is None:
+        return reflect_tables(None)
+
+    available = inspect(engine).get_table_names(schema=schema)
+    existing = set(available)
+    return reflect_selection(
+        lambda table_names: reflect_tables([name for name in table_names if name in existing]),
+        select_table_names(available, include, exclude),
+        schema=schema,
+        fk_depth=fk_depth,
+    )
+
+def reflect_batches(
+        engine: Engine, 
+        schema: typing.Optional[str] = None, 
+        workers: int = 4, 
+        bulk: bool = True, 
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.Iterator[MetaData]:
+    """Reflect a database schema in batches of tables, yielding the MetaData of each batch as soon as it is ready.
+
+    Foreign keys are not resolved, so a batch may refer to tables of another batch. At most `workers` batches are
+    reflected at the same time, and finished batches are yielded in the order they were started.
+    """
+
+    batches = _batches(inspect(engine).get_table_names(schema=schema), workers, batch_size)
+    reflector = BULK_REFLECTORS.get(engine.dialect.name) if bulk else None
+    if reflector is not None:
+        reflect_batch = lambda batch: reflector(engine, schema, batch)
+    else:
+        reflect_batch = lambda batch: _reflect_batch(engine, schema, batch)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        pending: typing.Deque[concurrent.futures.Future] = collections.deque()
+        for batch in batches:
+            if len(pending) >= max(workers, 1):
+                yield pending.popleft().result()
+            pending.append(executor.submit(reflect_batch, batch))
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+async def reflect_async(
+        engine: "AsyncEngine", 
+        schema: typing.Optional[str] = None, 
+        workers: int = 4, 
+        bulk: bool = True, 
+        batch_size: typing.Optional[int] = None,
+        include: typing.Optional[TablePatterns] = None,
+        exclude: typing.Optional[TablePatterns] = None,
+        fk_depth: typing.Optional[int] = None,
+    ) -> MetaData:
+    """Reflect a database schema through an `AsyncEngine` without blocking the event loop.
+
+    Each batch of tables is reflected on its own connection with `run_sync`, at most `workers` at a time, and the
+    batches are merged into a single MetaData in a worker thread. `include`, `exclude` and `fk_depth` select
+    tables like in `reflect`.
+    """
+
+    async with engine.connect() as connection:
+        available = await connection.run_sync(lambda sync_connection: inspect(sync_connection).get_table_names(schema=schema))
+
+    reflector = BULK_REFLECTORS.get(engine.dialect.name) if bulk else None
+    if reflector is not None:
+        reflect_batch = lambda sync_connection, batch: reflector(sync_connection, schema, batch)
+    else:
+        reflect_batch = lambda sync_connection, batch: _reflect_connection_batch(sync_connection, schema, batch)
+
+    semaphore = asyncio.Semaphore(max(workers, 1))
+    async def reflect_batch_async(batch: typing.List[str]) -> MetaData:
+        async with semaphore:
+            async with engine.connect() as connection:
+                return await connection.run_sync(reflect_batch, batch)
+
+    async def reflect_tables(table_names: typing.List[str]) -> MetaData:
+        batch_metadatas = await asyncio.gather(*(reflect_batch_async(batch) for batch in _batches(table_names, workers, batch_size)))
+        return await asyncio.to_thread(_merge, batch_metadatas)
+
+    if include is None and exclude is None:
+        return await reflect_tables(available)
+
+    existing = set(available)
+    return await reflect_selection_async(
+        lambda table_names: reflect_tables([name for name in table_names if name in existing]),
+        select_table_names(available, include, exclude),
+        schema=schema,
+        fk_depth=fk_depth,
+    )
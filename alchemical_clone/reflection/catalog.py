@@ -0,0 +1,103 @@
+import hashlib
+import typing
+
+from sqlalchemy import Engine, inspect, text
+
+CatalogSignature = typing.Callable[[Engine, typing.Optional[str]], typing.Dict[str, str]]
+
+
+def _hashes(items: typing.Dict[str, typing.Any]) -> typing.Dict[str, str]:
+    return {name: hashlib.sha256(repr(value).encode()).hexdigest() for name, value in items.items()}
+
+def sqlite_catalog_signature(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, str]:
+    """A hash of the DDL of every table of a SQLite database and of its indexes, read with a single catalog query."""
+
+    schema_name = schema if schema is not None else "main"
+    master = f"{engine.dialect.identifier_preparer.quote_identifier(schema_name)}.sqlite_master"
+    query = text(
+        f"SELECT m.type, m.name, m.tbl_name, m.sql FROM {master} m "
+        "WHERE m.type IN ('table', 'index') AND m.tbl_name NOT LIKE 'sqlite~_%' ESCAPE '~' "
+        "ORDER BY m.type DESC, m.name"
+    )
+    items: typing.Dict[str, typing.List[typing.Tuple[str, str, typing.Optional[str]]]] = {}
+    with engine.connect() as connection:
+        for type_, name, table_name, sql in connection.execute(query):
+            if type_ == "table" or table_name in items:
+                items.setdefault(table_name, []).append((type_, name, sql))
+    return _hashes(items)
+
+def inspector_catalog_signature(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, str]:
+    """A hash of the columns, keys, constraints and indexes of every table, read with SQLAlchemy's multi-table
+    inspection methods. Works for any dialect, but costs about as much as reflecting the schema."""
+
+    inspector = inspect(engine)
+    items: typing.Dict[str, typing.Dict[str, typing.Any]] = {name: {} for name in inspector.get_table_names(schema=schema)}
+    for kind, get_multi in (
+        ("columns", inspector.get_multi_columns),
+        ("primary_key", inspector.get_multi_pk_constraint),
+        ("foreign_keys", inspector.get_multi_foreign_keys),
+        ("indexes", inspector.get_multi_indexes),
+        ("unique_constraints", inspector.get_multi_unique_constraints),
+    ):
+        for (_, table_name), value in get_multi(schema=schema).items():
+            if table_name in items:
+                items[table_name][kind] = value
+    for value in items.values():
+        # Foreign keys within the schema should hash the same in every schema with the same tables
+        value["foreign_keys"] = [
+            {**foreign_key, "referred_schema": None} if foreign_key["referred_schema"] == schema else foreign_key
+            for foreign_key in value.get("foreign_keys", [])
+        ]
+    return _hashes(items)
+
+# Dialects with a cheap way of telling which tables changed
+CATALOG_SIGNATURES: typing.Dict[str, CatalogSignature] = {
+    "sqlite": sqlite_catalog_signature,
+}
+
+
+def catalog_signature(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, str]:
+    """A hash of the structure of every table of `schema`, which changes whenever the table changes. Tables with the
+    same structure in different schemas have the same hash."""
+
+    return CATALOG_SIGNATURES.get(engine.dialect.name, inspector_catalog_signature)(engine, schema)
+
+
+CatalogForeignKeys = typing.Callable[[Engine, typing.Optional[str]], typing.Dict[str, typing.Set[str]]]
+
+
+def sqlite_catalog_foreign_keys(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, typing.Set[str]]:
+    """The tables every table of a SQLite database refers to, read with a single catalog query."""
+
+    schema_name = schema if schema is not None else "main"
+    quoted_schema = engine.dialect.identifier_preparer.quote_identifier(schema_name)
+    query = text(
+        f"SELECT m.name, f.\"table\" FROM {quoted_schema}.sqlite_master m, pragma_foreign_key_list(m.name, :schema) f "
+        "WHERE m.type = 'table'"
+    )
+    referred_tables: typing.Dict[str, typing.Set[str]] = {}
+    with engine.connect() as connection:
+        for table_name, referred_table in connection.execute(query, {"schema": schema_name}):
+            referred_tables.setdefault(table_name, set()).add(referred_table)
+    return referred_tables
+
+def inspector_catalog_foreign_keys(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, typing.Set[str]]:
+    """The tables of the same schema every table refers to, read with SQLAlchemy's multi-table inspection."""
+
+    referred_tables: typing.Dict[str, typing.Set[str]] = {}
+    for (_, table_name), foreign_keys in inspect(engine).get_multi_foreign_keys(schema=schema).items():
+        for foreign_key in foreign_keys:
+            if foreign_key["referred_schema"] in (None, schema):
+                referred_tables.setdefault(table_name, set()).add(foreign_key["referred_table"])
+    return referred_tables
+
+# Dialects with a cheap way of reading which tables refer to which
+CATALOG_FOREIGN_KEYS: typing.Dict[str, CatalogForeignKeys] = {
+    "sqlite": sqlite_catalog_foreign_keys,
+}
+
+
+def catalog_foreign_keys(engine: Engine, schema: typing.Optional[str] = None) -> typing.Dict[str, typing.Set[str]]:
+    """The tables of `schema` every table of `schema` refers to with a foreign key, without reflecting them."""
+
+    return CATALOG_FOREIGN_KEYS.get(engine.dialect.name, inspector_catalog_foreign_keys)(engine, schema)
@@ -0,0 +1,45 @@
+import concurrent.futures
+import math
+import typing
+
+from sqlalchemy import Connection, Engine, MetaData, inspect
+
+
+def _reflect_connection_batch(connection: Connection, schema: typing.Optional[str], table_names: typing.List[str]) -> MetaData:
+    metadata = MetaData()
+    # Referenced tables are reflected by their own batch, so there is no need to follow foreign keys here
+    metadata.reflect(bind=connection, schema=schema, only=table_names, resolve_fks=False)
+    return metadata
+
+def _reflect_batch(engine: Engine, schema: typing.Optional[str], table_names: typing.List[str]) -> MetaData:
+    with engine.connect() as connection:
+        return _reflect_connection_batch(connection, schema, table_names)
+
+def _batches(table_names: typing.List[str], workers: int, batch_size: typing.Optional[int]) -> typing.List[typing.List[str]]:
+    if batch_size is None:
+        batch_size = max(1, math.ceil(len(table_names) / (max(workers, 1) * 4)))
+    return [table_names[i:i + batch_size] for i in range(0, len(table_names), batch_size)]
+
+def reflect_metadata(
+        engine: Engine, 
+        schema: typing.Optional[str] = None, 
+        workers: int = 4,
+        batch_size: typing.Optional[int] = None,
+        table_names: typing.Optional[typing.List[str]] = None,
+    ) -> MetaData:
+    """Reflect a database schema using several connections at once, and merge the results into a single MetaData.
+
+    At most `workers` connections are checked out from the engine's pool at the same time.
+    """
+
+    if table_names is None:
+        table_names = inspect(engine).get_table_names(schema=schema)
+    batches = _batches(table_names, workers, batch_size)
+
+    metadata = MetaData()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for batch_metadata in executor.map(lambda batch: _reflect_batch(engine, schema, batch), batches):
+            for table in batch_metadata.tables.values():
+                table.to_metadata(metadata)
+
+    return metadata
@@ -0,0 +1,107 @@
+import fnmatch
+import re
+import typing
+
+from sqlalchemy import MetaData
+
+from ..utils import foreign_key_target
+
+TablePattern = typing.Union[str, typing.Pattern[str]]
+TablePatterns = typing.Union[TablePattern, typing.Iterable[TablePattern]]
+
+
+def _patterns(patterns: TablePatterns) -> typing.List[TablePattern]:
+    if isinstance(patterns, (str, re.Pattern)):
+        return [patterns]
+    return list(patterns)
+
+def _matches(name: str, patterns: typing.List[TablePattern]) -> bool:
+    for pattern in patterns:
+        if isinstance(pattern, re.Pattern):
+            if pattern.fullmatch(name) is not None:
+                return True
+        elif fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+def select_table_names(
+        table_names: typing.Iterable[str],
+        include: typing.Optional[TablePatterns] = None,
+        exclude: typing.Optional[TablePatterns] = None,
+    ) -> typing.List[str]:
+    """Filter table names with glob patterns (e.g. `"user_*"`) or compiled regular expressions, which must match
+    the whole name. Without `include`, every table is included."""
+
+    include = _patterns(include) if include is not None else None
+    exclude = _patterns(exclude) if exclude is not None else []
+    return [
+        name for name in table_names
+        if (include is None or _matches(name, include)) and not _matches(name, exclude)
+    ]
+
+def _selection(
+        table_names: typing.List[str],
+        schema: typing.Optional[str],
+        fk_depth: typing.Optional[int],
+    ) -> typing.Generator[typing.List[str], MetaData, MetaData]:
+    """Yield the tables to reflect level by level, receiving the MetaData of each level, and return the merged
+    MetaData. Shared by the synchronous and asynchronous reflection of a selection."""
+
+    metadata = MetaData()
+    reflected: typing.Set[str] = set()
+    frontier = list(table_names)
+    depth = 0
+    while len(frontier) > 0:
+        frontier_metadata = yield frontier
+        reflected.update(frontier)
+        for table in frontier_metadata.tables.values():
+            table.to_metadata(metadata)
+
+        if fk_depth is not None and depth >= fk_depth:
+            break
+        referred_names = set()
+        for table in frontier_metadata.tables.values():
+            for foreign_key in table.foreign_keys:
+                referred_schema, referred_name, _ = foreign_key_target(foreign_key)
+                if referred_schema == schema and referred_name not in reflected:
+                    referred_names.add(referred_name)
+        frontier = sorted(referred_names)
+        depth += 1
+
+    return metadata
+
+def reflect_selection(
+        reflect_tables: typing.Callable[[typing.List[str]], MetaData],
+        table_names: typing.List[str],
+        schema: typing.Optional[str] = None,
+        fk_depth: typing.Optional[int] = None,
+    ) -> MetaData:
+    """Reflect `table_names`, and then the tables their foreign keys refer to, level by level, until no new tables
+    are referred to or `fk_depth` levels were followed. `reflect_tables` reflects a list of tables of `schema`.
+
+    Only tables of `schema` are followed. Foreign keys to tables that were not reflected are left dangling.
+    """
+
+    selection = _selection(table_names, schema, fk_depth)
+    try:
+        frontier = next(selection)
+        while True:
+            frontier = selection.send(reflect_tables(frontier))
+    except StopIteration as stop:
+        return stop.value
+
+async def reflect_selection_async(
+        reflect_tables: typing.Callable[[typing.List[str]], typing.Awaitable[MetaData]],
+        table_names: typing.List[str],
+        schema: typing.Optional[str] = None,
+        fk_depth: typing.Optional[int] = None,
+    ) -> MetaData:
+    """Like `reflect_selection`, with a coroutine function that reflects a list of tables."""
+
+    selection = _selection(table_names, schema, fk_depth)
+    try:
+        frontier = next(selection)
+        while True:
+            frontier = selection.send(await reflect_tables(frontier))
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,230 @@
+import contextlib
+import re
+import typing
+import warnings
+
+import sqlalchemy
+from sqlalchemy import (CheckConstraint, Column, Connection, Engine,
+                        ForeignKeyConstraint, Index, MetaData,
+                        PrimaryKeyConstraint, Table, UniqueConstraint,
+                        bindparam, inspect, text)
+from sqlalchemy.types import TypeEngine
+
+from .generic import _reflect_connection_batch
+
+_PK_PATTERN = re.compile(r'CONSTRAINT\s+(?:"(.+?)"|(\w+))\s+PRIMARY\s+KEY', re.I)
+_FK_PATTERN = re.compile(
+    r'(?:CONSTRAINT\s+(?:"(.+?)"|(\w+))\s+)?'
+    r'FOREIGN\s+KEY\s*\(\s*(.+?)\s*\)\s*'
+    r'REFERENCES\s+(?:"(.+?)"|([a-z0-9_\.]+))\s*\(\s*((?:(?:"[^"]+"|[a-z0-9_]+)\s*(?:,\s*)?)+)\)',
+    re.I,
+)
+_UNIQUE_PATTERN = re.compile(r'(?:CONSTRAINT\s+(?:"(.+?)"|(\w+))\s+)?UNIQUE\s*\((.+?)\)', re.I)
+_CHECK_PATTERN = re.compile(r'(?<![A-Za-z0-9_])(?:CONSTRAINT\s+("(?:[^"]|"")+"|\S+)\s+)?CHECK\s*\(', re.I)
+_COLUMN_NAME_PATTERN = re.compile(r'(?:"(.+?)")|([a-z0-9_]+)', re.I)
+
+
+# The SQLAlchemy major versions whose SQLite dialect has the private `_resolve_type_affinity`, which turns a declared
+# type into a SQLAlchemy type exactly like the dialect's own reflection does
+_TYPE_AFFINITY_VERSIONS = ("2.",)
+
+
+class _ReflectedTable(typing.NamedTuple):
+    sql: typing.Optional[str]
+    columns: typing.List[Column]
+    primary_key: typing.List[typing.Tuple[int, str]]
+    foreign_keys: typing.Dict[int, typing.Dict[str, typing.Any]]
+    indexes: typing.Dict[str, typing.Dict[str, typing.Any]]
+
+
+def _column_names(signature: str) -> typing.Tuple[str, ...]:
+    return tuple(match.group(1) or match.group(2) for match in _COLUMN_NAME_PATTERN.finditer(signature))
+
+def _closing_parenthesis(sql: str, start: int) -> typing.Optional[int]:
+    depth = 0
+    quote = None
+    for i in range(start, len(sql)):
+        char = sql[i]
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+def _check_constraints(sql: str) -> typing.List[CheckConstraint]:
+    constraints = []
+    for match in _CHECK_PATTERN.finditer(sql):
+        name = match.group(1)
+        if name is not None and name.startswith('"'):
+            name = name[1:-1].replace('""', '"')
+        close = _closing_parenthesis(sql, match.end() - 1)
+        if close is not None:
+            constraints.append((name, sql[match.end():close].strip()))
+    constraints.sort(key=lambda constraint: constraint[0] or "~")
+    return [CheckConstraint(text(sqltext), name=name) for name, sqltext in constraints]
+
+def _type_resolver(dialect) -> typing.Optional[typing.Callable[[str], TypeEngine]]:
+    """The dialect's resolution of declared column types, or None if this SQLAlchemy version may not have it."""
+
+    resolve_type_affinity = getattr(dialect, "_resolve_type_affinity", None)
+    if not sqlalchemy.__version__.startswith(_TYPE_AFFINITY_VERSIONS) or not callable(resolve_type_affinity):
+        return None
+    return resolve_type_affinity
+
+def reflect_sqlite_metadata(
+        engine: typing.Union[Engine, Connection], 
+        schema: typing.Optional[str] = None, 
+        table_names: typing.Optional[typing.List[str]] = None,
+    ) -> MetaData:
+    """Reflect a SQLite database using one bulk catalog query per kind of object, instead of several queries per table.
+
+    The pragma table-valued functions are joined against `sqlite_master`, and constraint names that SQLite only keeps
+    in the table's SQL are parsed from it, the same way SQLAlchemy's SQLite dialect does. An already open connection
+    can be given instead of an engine.
+
+    Column types are resolved by a private method of SQLAlchemy's SQLite dialect. On SQLAlchemy versions that aren't
+    known to have it, the tables are reflected with SQLAlchemy's generic reflection instead.
+    """
+
+    dialect = engine.dialect
+    resolve_type = _type_resolver(dialect)
+    if resolve_type is None:
+        with (contextlib.nullcontext(engine) if isinstance(engine, Connection) else engine.connect()) as connection:
+            if table_names is None:
+                table_names = inspect(connection).get_table_names(schema=schema)
+            return _reflect_connection_batch(connection, schema, table_names)
+
+    schema_name = schema if schema is not None else "main"
+    master = f"{dialect.identifier_preparer.quote_identifier(schema_name)}.sqlite_master"
+    table_filter = "m.type = 'table' AND m.name NOT LIKE 'sqlite~_%' ESCAPE '~'"
+    parameters: typing.Dict[str, typing.Any] = {"schema": schema_name}
+    bind_parameters = []
+    if table_names is not None:
+        # Filter in the query, so the pragmas only run for the requested tables
+        table_filter += " AND m.name IN :table_names"
+        parameters["table_names"] = list(table_names)
+        bind_parameters.append(bindparam("table_names", expanding=True))
+
+    tables: typing.Dict[str, _ReflectedTable] = {}
+    with (contextlib.nullcontext(engine) if isinstance(engine, Connection) else engine.connect()) as connection:
+        tables_query = text(f"SELECT m.name, m.sql FROM {master} m WHERE {table_filter} ORDER BY m.name").bindparams(*bind_parameters)
+        for name, sql in connection.execute(tables_query, parameters):
+            tables[name] = _ReflectedTable(sql, [], [], {}, {})
+
+        columns_query = text(
+            "SELECT m.name, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk, p.hidden "
+            f"FROM {master} m, pragma_table_xinfo(m.name, :schema) p "
+            f"WHERE {table_filter} ORDER BY m.name, p.cid"
+        ).bindparams(*bind_parameters)
+        for table_name, name, type_, notnull, default, pk, hidden in connection.execute(columns_query, parameters):
+            table = tables.get(table_name)
+            if table is None or hidden == 1:
+                continue
+            if hidden:
+                # Generated columns report their type as e.g. "INTEGER GENERATED ALWAYS"
+                type_ = re.sub("generated|always", "", type_, flags=re.I).strip()
+            table.columns.append(Column(
+                name,
+                resolve_type(type_.upper()),
+                nullable=not notnull,
+                server_default=text(str(default)) if default is not None else None,
+            ))
+            if pk:
+                table.primary_key.append((pk, name))
+
+        foreign_keys_query = text(
+            "SELECT m.name, p.id, p.\"table\", p.\"from\", p.\"to\", p.on_update, p.on_delete "
+            f"FROM {master} m, pragma_foreign_key_list(m.name, :schema) p "
+            f"WHERE {table_filter} ORDER BY m.name, p.id, p.seq"
+        ).bindparams(*bind_parameters)
+        for table_name, id_, referred_table, from_, to, on_update, on_delete in connection.execute(foreign_keys_query, parameters):
+            table = tables.get(table_name)
+            if table is None:
+                continue
+            foreign_key = table.foreign_keys.setdefault(id_, {
+                "referred_table": referred_table,
+                "constrained_columns": [],
+                "referred_columns": [],
+                "onupdate": on_update if on_update != "NO ACTION" else None,
+                "ondelete": on_delete if on_delete != "NO ACTION" else None,
+            })
+            foreign_key["constrained_columns"].append(from_)
+            foreign_key["referred_columns"].append(to)
+
+        indexes_query = text(
+            "SELECT m.name, il.name, il.\"unique\", il.origin, ii.name "
+            f"FROM {master} m, pragma_index_list(m.name, :schema) il, pragma_index_info(il.name, :schema) ii "
+            f"WHERE {table_filter} ORDER BY m.name, il.seq, ii.seqno"
+        ).bindparams(*bind_parameters)
+        for table_name, index_name, unique, origin, column_name in connection.execute(indexes_query, parameters):
+            table = tables.get(table_name)
+            if table is None or origin == "pk":
+                continue
+            index = table.indexes.setdefault(index_name, {"unique": bool(unique), "origin": origin, "columns": []})
+            index["columns"].append(column_name)
+
+        # Foreign keys declared without referred columns point to the primary key of the referred table, which may
+        # not be one of the reflected tables
+        primary_key_query = text("SELECT p.pk, p.name FROM pragma_table_info(:table, :schema) p WHERE p.pk > 0")
+        for table in tables.values():
+            for foreign_key in table.foreign_keys.values():
+                referred_table = foreign_key["referred_table"]
+                if any(column is None for column in foreign_key["referred_columns"]) and referred_table not in tables:
+                    primary_key = connection.execute(primary_key_query, {"table": referred_table, "schema": schema_name})
+                    foreign_key["referred_columns"] = [column for _, column in sorted(primary_key)]
+
+    metadata = MetaData()
+    for table_name, table in tables.items():
+        Table(table_name, metadata, *table.columns, *_constraints(tables, table, schema), schema=schema)
+    return metadata
+
+def _constraints(tables: typing.Dict[str, _ReflectedTable], table: _ReflectedTable, schema: typing.Optional[str]) -> typing.List[typing.Any]:
+    sql = table.sql or ""
+    constraints = []
+
+    if len(table.primary_key) > 0:
+        match = _PK_PATTERN.search(sql)
+        name = (match.group(1) or match.group(2)) if match is not None else None
+        constraints.append(PrimaryKeyConstraint(*[column for _, column in sorted(table.primary_key)], name=name))
+
+    foreign_key_names = {}
+    for match in _FK_PATTERN.finditer(sql):
+        name = match.group(1) or match.group(2)
+        signature = (_column_names(match.group(3)), match.group(4) or match.group(5), _column_names(match.group(6)))
+        foreign_key_names[signature] = name
+    for foreign_key in table.foreign_keys.values():
+        referred_columns = foreign_key["referred_columns"]
+        if any(column is None for column in referred_columns):
+            # No referred columns in the DDL means the primary key of the referred table
+            referred_table = tables.get(foreign_key["referred_table"])
+            referred_columns = [column for _, column in sorted(referred_table.primary_key)] if referred_table is not None else []
+        signature = (tuple(foreign_key["constrained_columns"]), foreign_key["referred_table"], tuple(referred_columns))
+        referred_table_name = foreign_key["referred_table"] if schema is None else f"{schema}.{foreign_key['referred_table']}"
+        constraints.append(ForeignKeyConstraint(
+            foreign_key["constrained_columns"],
+            [f"{referred_table_name}.{column}" for column in referred_columns],
+            name=foreign_key_names.get(signature),
+            onupdate=foreign_key["onupdate"],
+            ondelete=foreign_key["ondelete"],
+        ))
+
+    unique_names = {}
+    for match in _UNIQUE_PATTERN.finditer(sql):
+        unique_names[_column_names(match.group(3))] = match.group(1) or match.group(2)
+    for index_name, index in table.indexes.items():
+        if index["origin"] == "u":
+            constraints.append(UniqueConstraint(*index["columns"], name=unique_names.get(tuple(index["columns"]))))
+        elif any(column is None for column in index["columns"]):
+            warnings.warn(f"Skipped unsupported reflection of expression-based index {index_name}")
+        else:
+            constraints.append(Index(index_name, *index["columns"], unique=index["unique"]))
+
+    constraints.extend(_check_constraints(sql))
+    return constraints
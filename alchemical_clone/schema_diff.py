@@ -0,0 +1,162 @@
+import dataclasses
+import os
+import typing
+
+from .alchemical_column import AlchemicalColumn
+from .alchemical_constraint import AlchemicalConstraint
+from .alchemical_index import AlchemicalIndex
+from .alchemical_table import AlchemicalTable
+
+if typing.TYPE_CHECKING:
+    from .alchemical_lab import AlchemicalLab
+
+Element = typing.Union[AlchemicalColumn, AlchemicalConstraint, AlchemicalIndex]
+
+
+@dataclasses.dataclass
+class ElementChange:
+    """A column, constraint or index that was added, removed or altered."""
+
+    kind: str
+    name: str
+    change: str
+    # For altered elements, the old and new value of every field that changed
+    fields: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]] = dataclasses.field(default_factory=dict)
+
+    def describe(self) -> str:
+        symbol = {"added": "+", "removed": "-", "altered": "~"}[self.change]
+        description = f"{symbol} {self.kind} {self.name}"
+        if len(self.fields) > 0:
+            description += ": " + ", ".join(f"{field} {old} -> {new}" for field, (old, new) in self.fields.items())
+        return description
+
+
+@dataclasses.dataclass
+class TableDiff:
+    """A table that was added, removed or altered, with the changes to its elements if it was altered."""
+
+    schema: typing.Optional[str]
+    name: str
+    change: str
+    fields: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]] = dataclasses.field(default_factory=dict)
+    elements: typing.List[ElementChange] = dataclasses.field(default_factory=list)
+
+    @property
+    def fullname(self) -> str:
+        return f"{self.schema}.{self.name}" if self.schema is not None else self.name
+
+
+@dataclasses.dataclass
+class SchemaDiff:
+    """Every difference between two labs, table by table."""
+
+    tables: typing.List[TableDiff] = dataclasses.field(default_factory=list)
+
+    def _tables(self, change: str) -> typing.List[TableDiff]:
+        return [table for table in self.tables if table.change == change]
+
+    @property
+    def added(self) -> typing.List[TableDiff]:
+        return self._tables("added")
+
+    @property
+    def removed(self) -> typing.List[TableDiff]:
+        return self._tables("removed")
+
+    @property
+    def altered(self) -> typing.List[TableDiff]:
+        return self._tables("altered")
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.tables) == 0
+
+    def report(self) -> str:
+        """A human-readable summary of the changes."""
+
+        lines = []
+        for table in self.tables:
+            symbol = {"added": "+", "removed": "-", "altered": "~"}[table.change]
+            lines.append(f"{symbol} table {table.fullname}")
+            for field, (old, new) in table.fields.items():
+                lines.append(f"    ~ {field} {old} -> {new}")
+            for element in table.elements:
+                lines.append(f"    {element.describe()}")
+        lines.append(f"{len(self.added)} tables added, {len(self.removed)} removed, {len(self.altered)} altered")
+        return "\n".join(lines)
+
+
+def _element_key(element: Element) -> typing.Hashable:
+    # Unnamed constraints can only be told apart by their whole signature
+    return element.name if element.name is not None else element.signature()
+
+def _element_name(element: Element) -> str:
+    if element.name is not None:
+        return element.name
+    return f"{getattr(element, 'type', 'Index')}({', '.join(column.name for column in element.columns)})"
+
+def _diff_elements(kind: str, old_elements: typing.List[Element], new_elements: typing.List[Element]) -> typing.List[ElementChange]:
+    old_by_key = {_element_key(element): element for element in old_elements}
+    new_by_key = {_element_key(element): element for element in new_elements}
+
+    changes = []
+    for key, element in old_by_key.items():
+        if key not in new_by_key:
+            changes.append(ElementChange(kind, _element_name(element), "removed"))
+    for key, element in new_by_key.items():
+        old_element = old_by_key.get(key)
+        if old_element is None:
+            changes.append(ElementChange(kind, _element_name(element), "added"))
+            continue
+        old_signature, new_signature = old_element.signature(), element.signature()
+        if old_signature != new_signature:
+            fields = {
+                field: (old, new)
+                for field, old, new in zip(element.SIGNATURE_FIELDS, old_signature, new_signature)
+                if old != new
+            }
+            changes.append(ElementChange(kind, _element_name(element), "altered", fields))
+    return changes
+
+def diff_tables(old: AlchemicalTable, new: AlchemicalTable) -> TableDiff:
+    """Compare two versions of the same table, element by element."""
+
+    fields = {
+        field: (getattr(old, field), getattr(new, field))
+        for field in ("class_name", "comment")
+        if getattr(old, field) != getattr(new, field)
+    }
+    elements = (
+        _diff_elements("column", old.columns, new.columns)
+        + _diff_elements("constraint", old.constraints, new.constraints)
+        + _diff_elements("index", old.indexes, new.indexes)
+    )
+    return TableDiff(new.schema, new.name, "altered", fields, elements)
+
+def diff_labs(old: "AlchemicalLab", new: "AlchemicalLab") -> SchemaDiff:
+    """Compare two labs. The structures of tables found in both are compared first, and only the tables whose
+    structure differs are compared column by column, constraint by constraint and index by index."""
+
+    old_tables = {(table.schema, table.name): table for table in old.tables}
+    new_tables = {(table.schema, table.name): table for table in new.tables}
+
+    tables = []
+    for key in sorted(old_tables.keys() | new_tables.keys(), key=lambda key: (key[0] or "", key[1])):
+        old_table, new_table = old_tables.get(key), new_tables.get(key)
+        if new_table is None:
+            tables.append(TableDiff(old_table.schema, old_table.name, "removed"))
+        elif old_table is None:
+            tables.append(TableDiff(new_table.schema, new_table.name, "added"))
+        elif old_table.structure() != new_table.structure():
+            table_diff = diff_tables(old_table, new_table)
+            # Changes that only affect the order of columns have no element changes
+            if len(table_diff.fields) > 0 or len(table_diff.elements) > 0:
+                tables.append(table_diff)
+    return SchemaDiff(tables)
+
+def diff_snapshots(old_path: typing.Union[str, os.PathLike], new_path: typing.Union[str, os.PathLike]) -> SchemaDiff:
+    """Compare two snapshots written by `AlchemicalLab.to_snapshot`."""
+
+    from .alchemical_lab import AlchemicalLab
+
+    return diff_labs(AlchemicalLab.from_snapshot(old_path), AlchemicalLab.from_snapshot(new_path))
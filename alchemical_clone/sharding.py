@@ -0,0 +1,183 @@
+import dataclasses
+import typing
+
+if typing.TYPE_CHECKING:
+    from .alchemical_lab import AlchemicalLab
+    from .alchemical_table import AlchemicalTable
+
+# "component" keeps the tables connected by foreign keys together, "schema" puts every schema in its own shard,
+# and "size" splits the tables, in order, into shards of about the same size
+ShardKey = typing.Literal["component", "schema", "size"]
+
+Dependencies = typing.Dict["AlchemicalTable", typing.Set["AlchemicalTable"]]
+
+
+@dataclasses.dataclass
+class ShardLayout:
+    """Packs the models of a clone into a few `_shard_<n>` modules, instead of generating a module per table.
+
+    With "component" `shard_by`, the groups of tables connected by foreign keys are spread over at most `shards`
+    modules, largest first, so relationships never cross modules. With "size", the tables are split, in order, into
+    `shards` modules of about the same size, or into modules of at most `max_size` columns, constraints and indexes
+    if it is given. With "schema", every schema gets its own module.
+
+    Shards that would import each other, for the relationships added by plugins, are merged.
+    """
+
+    shards: int = 16
+    shard_by: ShardKey = "component"
+    max_size: typing.Optional[int] = None
+
+    def __post_init__(self):
+        if self.shard_by not in ("component", "schema", "size"):
+            raise ValueError(f"Unknown shard key: {self.shard_by!r}")
+        if self.shards < 1:
+            raise ValueError("A layout needs at least one shard.")
+
+
+def table_size(table: "AlchemicalTable") -> int:
+    """A rough measure of the amount of code generated for `table`."""
+
+    return 1 + len(table.columns) + len(table.constraints) + len(table.indexes)
+
+def _components(tables: typing.List["AlchemicalTable"]) -> typing.List[typing.List["AlchemicalTable"]]:
+    parents = {table: table for table in tables}
+
+    def find(table: "AlchemicalTable") -> "AlchemicalTable":
+        while parents[table] is not table:
+            parents[table] = parents[parents[table]]
+            table = parents[table]
+        return table
+
+    for table in tables:
+        for constraint in table.constraints:
+            if constraint.referred_table is not None and constraint.referred_table in parents:
+                parents[find(constraint.referred_table)] = find(table)
+
+    components: typing.Dict["AlchemicalTable", typing.List["AlchemicalTable"]] = {}
+    for table in tables:
+        components.setdefault(find(table), []).append(table)
+    return list(components.values())
+
+def _pack(groups: typing.List[typing.List["AlchemicalTable"]], shards: int) -> typing.List[typing.List["AlchemicalTable"]]:
+    """Spread `groups` over `shards` bins, each of the largest groups going to the smallest bin so far."""
+
+    bins: typing.List[typing.List["AlchemicalTable"]] = [[] for _ in range(min(shards, len(groups)))]
+    sizes = [0] * len(bins)
+    for group in sorted(groups, key=lambda group: -sum(table_size(table) for table in group)):
+        smallest = sizes.index(min(sizes))
+        bins[smallest].extend(group)
+        sizes[smallest] += sum(table_size(table) for table in group)
+    return bins
+
+def _split(tables: typing.List["AlchemicalTable"], max_size: int) -> typing.List[typing.List["AlchemicalTable"]]:
+    """Split `tables`, in order, into chunks of at most `max_size`, unless a single table is larger than that."""
+
+    chunks: typing.List[typing.List["AlchemicalTable"]] = []
+    size = 0
+    for table in tables:
+        if len(chunks) == 0 or (size > 0 and size + table_size(table) > max_size):
+            chunks.append([])
+            size = 0
+        chunks[-1].append(table)
+        size += table_size(table)
+    return chunks
+
+def _split_evenly(tables: typing.List["AlchemicalTable"], shards: int) -> typing.List[typing.List["AlchemicalTable"]]:
+    """Split `tables`, in order, into at most `shards` chunks of about the same size."""
+
+    total_size = sum(table_size(table) for table in tables)
+    chunks: typing.List[typing.List["AlchemicalTable"]] = [[] for _ in range(shards)]
+    size = 0
+    for table in tables:
+        # Every table goes to the chunk its middle falls in
+        chunks[min(shards - 1, (2 * size + table_size(table)) * shards // (2 * total_size))].append(table)
+        size += table_size(table)
+    return [chunk for chunk in chunks if len(chunk) > 0]
+
+def _by_schema(tables: typing.List["AlchemicalTable"]) -> typing.List[typing.List["AlchemicalTable"]]:
+    schemas: typing.Dict[typing.Optional[str], typing.List["AlchemicalTable"]] = {}
+    for table in tables:
+        schemas.setdefault(table.schema, []).append(table)
+    return list(schemas.values())
+
+def _reachable(shard: int, edges: typing.Dict[int, typing.Set[int]]) -> typing.Set[int]:
+    reached, pending = {shard}, [shard]
+    while pending:
+        for other in edges.get(pending.pop(), ()):
+            if other not in reached:
+                reached.add(other)
+                pending.append(other)
+    return reached
+
+def _merge_cycles(shards: typing.List[typing.List["AlchemicalTable"]], dependencies: Dependencies) -> typing.List[typing.List["AlchemicalTable"]]:
+    """Merge the shards that depend on each other, directly or not, so shard modules never import each other
+    in a cycle."""
+
+    shard_of = {table: i for i, shard in enumerate(shards) for table in shard}
+    edges: typing.Dict[int, typing.Set[int]] = {}
+    for table, imported_tables in dependencies.items():
+        for imported_table in imported_tables:
+            if table in shard_of and imported_table in shard_of and shard_of[table] != shard_of[imported_table]:
+                edges.setdefault(shard_of[table], set()).add(shard_of[imported_table])
+
+    reachable = [_reachable(i, edges) for i in range(len(shards))]
+    merged: typing.Dict[int, typing.List["AlchemicalTable"]] = {}
+    for i, shard in enumerate(shards):
+        # Every shard of a cycle goes to the first shard of that cycle
+        first = min(j for j in reachable[i] if i in reachable[j])
+        merged.setdefault(first, []).extend(shard)
+    return list(merged.values())
+
+def _definition_order(tables: typing.List["AlchemicalTable"], dependencies: Dependencies) -> typing.List["AlchemicalTable"]:
+    """`tables` in order, except that tables come after the tables of the shard they import."""
+
+    positions = {table: i for i, table in enumerate(tables)}
+    ordered, visited = [], set()
+
+    def visit(table: "AlchemicalTable"):
+        if table in visited:
+            return
+        visited.add(table)
+        imported_tables = [imported_table for imported_table in dependencies.get(table, ()) if imported_table in positions]
+        for imported_table in sorted(imported_tables, key=positions.__getitem__):
+            visit(imported_table)
+        ordered.append(table)
+
+    for table in tables:
+        visit(table)
+    return ordered
+
+def plugin_dependencies(lab: "AlchemicalLab", plugin_imports: typing.Dict[str, typing.Dict[str, typing.Set[str]]]) -> Dependencies:
+    """The tables whose module the module of every table imports, according to `plugin_imports`."""
+
+    tables_by_module = {table.name: table for table in lab.tables}
+    dependencies: Dependencies = {}
+    for table in lab.tables:
+        for package in plugin_imports.get(table.name, {}):
+            imported_table = tables_by_module.get(package[1:]) if package.startswith(".") else None
+            if imported_table is not None and imported_table is not table:
+                dependencies.setdefault(table, set()).add(imported_table)
+    return dependencies
+
+def assign_shards(
+        lab: "AlchemicalLab",
+        layout: ShardLayout,
+        plugin_imports: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Set[str]]]] = None,
+    ) -> typing.Dict[str, typing.List["AlchemicalTable"]]:
+    """Split the tables of `lab` into shard modules according to `layout`. Returns the tables of every shard,
+    in the order they must be defined in."""
+
+    tables = lab.tables
+    if layout.shard_by == "component":
+        shards = _pack(_components(tables), layout.shards)
+    elif layout.shard_by == "size":
+        shards = _split(tables, layout.max_size) if layout.max_size is not None else _split_evenly(tables, layout.shards)
+    else:
+        shards = _by_schema(tables)
+
+    dependencies = plugin_dependencies(lab, plugin_imports or {})
+    positions = {table: i for i, table in enumerate(tables)}
+    shards = [sorted(shard, key=positions.__getitem__) for shard in _merge_cycles(shards, dependencies)]
+    shards.sort(key=lambda shard: positions[shard[0]])
+    return {f"_shard_{i}": _definition_order(shard, dependencies) for i, shard in enumerate(shards)}
@@ -0,0 +1,54 @@
+import gzip
+import json
+import os
+import typing
+
+from .alchemical_table import AlchemicalTable
+
+if typing.TYPE_CHECKING:
+    from .alchemical_lab import AlchemicalLab
+
+SNAPSHOT_FORMAT = "alchemical-clone-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def _open(path: typing.Union[str, os.PathLike], mode: str) -> typing.TextIO:
+    if os.fspath(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def dump_snapshot(lab: "AlchemicalLab") -> typing.Dict[str, typing.Any]:
+    """Convert the intermediate representation of a lab into JSON-serializable data."""
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "tables": [table.to_dict() for table in lab.tables],
+    }
+
+def restore_snapshot(lab: "AlchemicalLab", snapshot: typing.Dict[str, typing.Any]):
+    """Add the tables of a snapshot created by `dump_snapshot` to an empty lab."""
+
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Not an Alchemical Clone snapshot.")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')} (expected {SNAPSHOT_VERSION}).")
+
+    # Constraints can refer to any other table, so they are only restored once every table exists
+    tables = [AlchemicalTable.from_dict(data, lab) for data in snapshot["tables"]]
+    for table in tables:
+        lab.add_table(table)
+    for table, data in zip(tables, snapshot["tables"]):
+        table.restore_constraints(data)
+
+def save_snapshot(lab: "AlchemicalLab", path: typing.Union[str, os.PathLike]):
+    """Write a snapshot of a lab to `path`, as compact JSON. Paths ending in `.gz` are gzip-compressed."""
+
+    with _open(path, "w") as f:
+        json.dump(dump_snapshot(lab), f, separators=(",", ":"))
+
+def load_snapshot(path: typing.Union[str, os.PathLike]) -> typing.Dict[str, typing.Any]:
+    """Read a snapshot written by `save_snapshot`."""
+
+    with _open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,192 @@
+import contextlib
+import dataclasses
+import typing
+
+from sqlalchemy import Connection, Engine, func, select, table, text
+
+from .instrumentation import measure
+from .utils import quoted_string
+
+if typing.TYPE_CHECKING:
+    from .alchemical_lab import AlchemicalLab
+
+RowCountEstimator = typing.Callable[[Connection, typing.Optional[str], typing.List[str], typing.Optional[int]], typing.Dict[str, int]]
+
+
+def count_row_counts(
+        connection: Connection,
+        schema: typing.Optional[str],
+        table_names: typing.List[str],
+        max_rows: typing.Optional[int] = None,
+    ) -> typing.Dict[str, int]:
+    """Count the rows of every table, stopping at `max_rows` rows per table so huge tables stay cheap to count."""
+
+    row_counts = {}
+    for table_name in table_names:
+        rows = select(text("1")).select_from(table(table_name, schema=schema))
+        if max_rows is not None:
+            rows = rows.limit(max_rows)
+        row_counts[table_name] = connection.execute(select(func.count()).select_from(rows.subquery())).scalar_one()
+    return row_counts
+
+def sqlite_row_counts(
+        connection: Connection,
+        schema: typing.Optional[str],
+        table_names: typing.List[str],
+        max_rows: typing.Optional[int] = None,
+    ) -> typing.Dict[str, int]:
+    """Read row counts from `sqlite_stat1`, which `ANALYZE` fills in, and count the rows of the tables it doesn't cover."""
+
+    schema_name = schema if schema is not None else "main"
+    quoted_schema = connection.dialect.identifier_preparer.quote_identifier(schema_name)
+    row_counts = {}
+    has_stat1 = connection.execute(
+        text(f"SELECT 1 FROM {quoted_schema}.sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    ).first() is not None
+    if has_stat1:
+        # The first number of every stat is the number of rows of the table
+        query = text(f"SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM {quoted_schema}.sqlite_stat1 GROUP BY tbl")
+        wanted = set(table_names)
+        row_counts = {table_name: row_count for table_name, row_count in connection.execute(query) if table_name in wanted}
+    missing = [table_name for table_name in table_names if table_name not in row_counts]
+    row_counts.update(count_row_counts(connection, schema, missing, max_rows))
+    return row_counts
+
+def postgresql_row_counts(
+        connection: Connection,
+        schema: typing.Optional[str],
+        table_names: typing.List[str],
+        max_rows: typing.Optional[int] = None,
+    ) -> typing.Dict[str, int]:
+    """Read the planner's row estimates from `pg_class`. Tables that were never analyzed have no estimate."""
+
+    query = text(
+        "SELECT c.relname, c.reltuples FROM pg_catalog.pg_class c "
+        "JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relkind IN ('r', 'p') AND n.nspname = COALESCE(:schema, current_schema())"
+    )
+    wanted = set(table_names)
+    return {
+        table_name: int(row_count)
+        for table_name, row_count in connection.execute(query, {"schema": schema})
+        if table_name in wanted and row_count >= 0
+    }
+
+def mysql_row_counts(
+        connection: Connection,
+        schema: typing.Optional[str],
+        table_names: typing.List[str],
+        max_rows: typing.Optional[int] = None,
+    ) -> typing.Dict[str, int]:
+    """Read the storage engine's row estimates from `information_schema.tables`."""
+
+    query = text(
+        "SELECT table_name, table_rows FROM information_schema.tables "
+        "WHERE table_schema = COALESCE(:schema, DATABASE())"
+    )
+    wanted = set(table_names)
+    return {
+        table_name: int(row_count)
+        for table_name, row_count in connection.execute(query, {"schema": schema})
+        if table_name in wanted and row_count is not None
+    }
+
+# Dialects whose catalog keeps row estimates, or has a cheaper way of counting rows
+ROW_COUNT_ESTIMATORS: typing.Dict[str, RowCountEstimator] = {
+    "sqlite": sqlite_row_counts,
+    "postgresql": postgresql_row_counts,
+    "mysql": mysql_row_counts,
+    "mariadb": mysql_row_counts,
+}
+
+
+def estimate_row_counts(
+        engine: typing.Union[Engine, Connection],
+        lab: "AlchemicalLab",
+        max_rows: typing.Optional[int] = None,
+    ) -> typing.Dict[typing.Tuple[typing.Optional[str], str], int]:
+    """Estimate the number of rows of every table of `lab`, keyed by schema and name. Tables without an estimate
+    are left out. An already open connection can be given instead of an engine."""
+
+    table_names: typing.Dict[typing.Optional[str], typing.List[str]] = {}
+    for lab_table in lab.tables:
+        table_names.setdefault(lab_table.schema, []).append(lab_table.name)
+
+    estimator = ROW_COUNT_ESTIMATORS.get(engine.dialect.name, count_row_counts)
+    row_counts = {}
+    with (contextlib.nullcontext(engine) if isinstance(engine, Connection) else engine.connect()) as connection:
+        for schema, names in table_names.items():
+            for table_name, row_count in estimator(connection, schema, names, max_rows).items():
+                row_counts[(schema, table_name)] = row_count
+    return row_counts
+
+
+@dataclasses.dataclass
+class LoadingPolicy:
+    """Thresholds that pick a relationship loading strategy out of table sizes.
+
+    A relationship to a single row (from a foreign key to the table it refers to) is loaded with a join when the
+    referred table has at most `joined_max_rows` rows, such as a lookup table, and with `selectin` otherwise.
+
+    A collection (the reverse of a foreign key, or a many-to-many relationship) is loaded according to its
+    fan-out, the average number of rows on the other side for each row: with `selectin` up to
+    `selectin_max_fanout`, as a `dynamic` query from `dynamic_min_fanout` on, and with `raise` in between, so
+    those collections are only loaded when asked for explicitly.
+    """
+
+    joined_max_rows: int = 1000
+    selectin_max_fanout: float = 100
+    dynamic_min_fanout: float = 10000
+    # Counting stops at this many rows per table on dialects without row estimates
+    max_rows: typing.Optional[int] = 1_000_000
+
+    def scalar_strategy(self, referred_rows: int) -> str:
+        return "joined" if referred_rows <= self.joined_max_rows else "selectin"
+
+    def collection_strategy(self, fanout: float) -> str:
+        if fanout <= self.selectin_max_fanout:
+            return "selectin"
+        if fanout >= self.dynamic_min_fanout:
+            return "dynamic"
+        return "raise"
+
+
+def _fanout(rows: int, referred_rows: int) -> float:
+    return rows / max(referred_rows, 1)
+
+def apply_loading_strategies(
+        lab: "AlchemicalLab",
+        row_counts: typing.Dict[typing.Tuple[typing.Optional[str], str], int],
+        policy: typing.Optional[LoadingPolicy] = None,
+    ):
+    """Set the `lazy` (towards the referred table) and `reverse_lazy` (towards the referring table) loading
+    strategies of every foreign key of `lab`, from the row counts of the tables on both sides. Foreign keys with a
+    table without a row count keep SQLAlchemy's default."""
+
+    policy = policy if policy is not None else LoadingPolicy()
+    for lab_table in lab.tables:
+        rows = row_counts.get((lab_table.schema, lab_table.name))
+        for constraint in lab_table.constraints:
+            if constraint.referred_table is None:
+                continue
+            constraint.lazy, constraint.reverse_lazy = None, None
+            referred_rows = row_counts.get((constraint.referred_table.schema, constraint.referred_table.name))
+            if rows is None or referred_rows is None:
+                continue
+            constraint.lazy = policy.scalar_strategy(referred_rows)
+            constraint.reverse_lazy = policy.collection_strategy(_fanout(rows, referred_rows))
+
+def apply_statistics(engine: typing.Union[Engine, Connection], lab: "AlchemicalLab", policy: typing.Optional[LoadingPolicy] = None):
+    """Estimate the size of every table of `lab` from the database behind `engine`, and pick the loading
+    strategy of every relationship with `policy`."""
+
+    policy = policy if policy is not None else LoadingPolicy()
+    with measure(lab.observer, "statistics") as measurement:
+        row_counts = estimate_row_counts(engine, lab, policy.max_rows)
+        apply_loading_strategies(lab, row_counts, policy)
+        measurement.count = len(row_counts)
+
+def lazy_argument(strategy: typing.Optional[str]) -> str:
+    """The `lazy` argument of a generated relationship, or nothing for SQLAlchemy's default."""
+
+    return f", lazy={quoted_string(strategy)}" if strategy is not None else ""
@@ -0,0 +1,217 @@
+import queue
+import threading
+import typing
+
+from sqlalchemy import Engine
+
+from .alchemical_lab import (_BASE_FILE_CODE, AlchemicalLab, Plugin,
+                             _clone_table, _init_module_code,
+                             _lazy_init_module_code, _write_module)
+from .alchemical_table import AlchemicalTable
+from .deferral import DeferralPolicy, defer_table_columns
+from .generated_code import GeneratedCode
+from .instrumentation import Observer, measure
+from .output import OutputSink, PathLike, output_sink
+from .reflection import reflect_batches
+
+_DONE = object()
+
+
+class _Writers:
+    """A pool of threads that generate and write table modules as tables are put in a bounded queue."""
+
+    def __init__(self, sink: OutputSink, jobs: int, queue_size: int, observer: typing.Optional[Observer]):
+        self.sink = sink
+        self.observer = observer
+        self.errors: typing.Dict[AlchemicalTable, NotImplementedError] = {}
+        self.exception: typing.Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(max(jobs, 1))]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self.exception is not None:
+                # Keep draining the queue, so the producer never blocks on a dead pool
+                self._queue.task_done()
+                continue
+            table, plugin_code, plugin_imports = item
+            try:
+                result = _clone_table(self.sink, table, plugin_code, plugin_imports, None, self.observer)
+                if result.error is not None:
+                    self.errors[table] = result.error
+            except BaseException as e:
+                self.exception = e
+            finally:
+                self._queue.task_done()
+
+    def put(
+            self, 
+            table: AlchemicalTable, 
+            plugin_code: typing.Optional[typing.List[GeneratedCode]] = None, 
+            plugin_imports: typing.Optional[typing.Dict[str, typing.Set[str]]] = None,
+        ):
+        self._queue.put((table, plugin_code or [], plugin_imports or {}))
+
+    def wait(self):
+        """Wait until every table put so far has been written."""
+
+        self._queue.join()
+
+    def join(self):
+        for _ in self._threads:
+            self._queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        if self.exception is not None:
+            raise self.exception
+
+
+def stream_clone(
+        engine: Engine,
+        directory: typing.Union[PathLike, OutputSink],
+        schema: typing.Optional[str] = None,
+        plugins: typing.Optional[typing.List[Plugin]] = None,
+        workers: int = 4,
+        bulk: bool = True,
+        jobs: int = 1,
+        batch_size: typing.Optional[int] = None,
+        queue_size: int = 64,
+        lazy: bool = False,
+        deferral_policy: typing.Optional[DeferralPolicy] = None,
+        observer: typing.Optional[Observer] = None,
+    ) -> AlchemicalLab:
+    """Reflect the database behind `engine` and clone it into `directory`, overlapping reflection with code generation.
+
+    Tables are reflected in batches by `workers` connections. As soon as every table a table's foreign keys refer to
+    has been reflected, its properties are computed and it is handed to `jobs` writer threads through a queue of at most
+    `queue_size` tables, which generate and write its module. The reflected SQLAlchemy objects are released once a table
+    has been computed. Plugins need the whole lab, so they run once every table has been computed, and only the modules
+    they contribute to are written again. Sinks that can't remove modules, like zip archives, can't replace them
+    either, so with those, every module is written once the plugins have run. Large columns are deferred according to
+    `deferral_policy`, as in `AlchemicalLab.create_clone`.
+
+    Foreign keys to tables that were never reflected are skipped with a warning, like in `AlchemicalLab`.
+
+    `directory` can also be an `output.OutputSink`, as in `AlchemicalLab.create_clone`.
+
+    Returns the (detached) lab that was built along the way.
+    """
+
+    lab = AlchemicalLab(observer=observer)
+    with measure(observer, "stream_clone") as measurement:
+        _stream_clone(lab, engine, output_sink(directory), schema, plugins or [], workers, bulk, jobs, batch_size, queue_size, lazy, deferral_policy)
+        measurement.count = len(lab.tables)
+    return lab
+
+def _stream_clone(
+        lab: AlchemicalLab,
+        engine: Engine,
+        sink: OutputSink,
+        schema: typing.Optional[str],
+        plugins: typing.List[Plugin],
+        workers: int,
+        bulk: bool,
+        jobs: int,
+        batch_size: typing.Optional[int],
+        queue_size: int,
+        lazy: bool,
+        deferral_policy: typing.Optional[DeferralPolicy],
+    ):
+    try:
+        _stream_tables(lab, engine, sink, schema, plugins, workers, bulk, jobs, batch_size, queue_size, lazy, deferral_policy)
+    finally:
+        # The policy only applies to this clone, as in `AlchemicalLab.create_clone`
+        if deferral_policy is not None:
+            for table in lab.tables:
+                for column in table.columns:
+                    column.deferred, column.deferred_group = False, None
+
+def _stream_tables(
+        lab: AlchemicalLab,
+        engine: Engine,
+        sink: OutputSink,
+        schema: typing.Optional[str],
+        plugins: typing.List[Plugin],
+        workers: int,
+        bulk: bool,
+        jobs: int,
+        batch_size: typing.Optional[int],
+        queue_size: int,
+        lazy: bool,
+        deferral_policy: typing.Optional[DeferralPolicy],
+    ):
+    observer = lab.observer
+    _write_module(sink, "_base.py", _BASE_FILE_CODE, False)
+
+    writers = _Writers(sink, jobs, queue_size, observer)
+    # Modules can only be rewritten with the contributions of plugins if the sink can replace them
+    write_early = len(plugins) == 0 or sink.supports_remove
+
+    def compute_table(table: AlchemicalTable):
+        with measure(observer, "compute_properties", table.name) as measurement:
+            table.compute_constraint_properties()
+            measurement.count = len(table.columns)
+        table.detach()
+        if deferral_policy is not None:
+            defer_table_columns(table, deferral_policy)
+        if write_early:
+            writers.put(table)
+
+    try:
+        pending: typing.List[AlchemicalTable] = []
+        batches = reflect_batches(engine, schema=schema, workers=workers, bulk=bulk, batch_size=batch_size)
+        while True:
+            with measure(observer, "reflection") as measurement:
+                metadata = next(batches, None)
+                if metadata is not None:
+                    measurement.count = len(metadata.tables)
+            if metadata is None:
+                break
+
+            for sqlalchemy_table in metadata.tables.values():
+                table = AlchemicalTable(sqlalchemy_table, lab)
+                lab.add_table(table)
+                table.compute_column_properties()
+                pending.append(table)
+            # Modules are written as soon as their table is computed, so name clashes must be caught before that
+            lab._check_generated_names()
+
+            # A table can be computed once every table it refers to is part of the lab, including itself
+            waiting = []
+            for table in pending:
+                if all(lab.table_from_name(name, referred_schema) is not None for referred_schema, name in table.referred_table_keys()):
+                    compute_table(table)
+                else:
+                    waiting.append(table)
+            pending = waiting
+            # Tables that are still waiting would otherwise keep the whole batch alive through their MetaData
+            metadata.clear()
+
+        # The remaining tables refer to tables that were never reflected, whose foreign keys are skipped
+        for table in pending:
+            compute_table(table)
+
+        if len(plugins) > 0:
+            plugin_code, plugin_imports = lab._run_plugins(plugins, jobs, None)
+            # The modules written so far must not overwrite the ones rewritten with their contributions
+            writers.wait()
+            for table in lab.tables:
+                if not write_early or table.name in plugin_code or table.name in plugin_imports:
+                    writers.put(table, plugin_code.get(table.name), plugin_imports.get(table.name))
+    finally:
+        writers.join()
+
+    generated_tables = []
+    for table in lab.tables:
+        if table in writers.errors:
+            print(f"Error generating table {table.name}: {writers.errors[table]}")
+            continue
+        generated_tables.append(table)
+
+    init_module_code = _lazy_init_module_code(generated_tables) if lazy else _init_module_code(generated_tables)
+    _write_module(sink, "__init__.py", init_module_code, False)
@@ -0,0 +1,142 @@
+import collections
+import threading
+import typing
+
+import sqlalchemy
+from sqlalchemy import util
+from sqlalchemy.types import TypeEngine
+
+TypeImports = typing.Tuple[typing.Tuple[str, str], ...]
+
+
+class RenderedType(typing.NamedTuple):
+    # The code that builds the type, e.g. "String(length=45)"
+    expression: str
+    # The name of the type's class, e.g. "String"
+    name: str
+    # The (module, name) pairs the expression needs to be imported
+    imports: TypeImports
+
+TypeRenderer = typing.Callable[[TypeEngine], RenderedType]
+
+
+def _import_module(type_class: typing.Type[TypeEngine], module: typing.Optional[str]) -> str:
+    if module is not None:
+        return module
+    if getattr(sqlalchemy, type_class.__name__, None) is type_class:
+        return "sqlalchemy"
+    return type_class.__module__
+
+def _nested_types(type_: TypeEngine) -> typing.Iterator[TypeEngine]:
+    # Types that take other types as arguments, like ARRAY(Integer()) or JSONB(astext_type=Text())
+    for name in util.get_cls_kwargs(type_.__class__):
+        value = getattr(type_, name, None)
+        if isinstance(value, TypeEngine):
+            yield value
+
+def _type_imports(type_: TypeEngine, module: typing.Optional[str] = None) -> TypeImports:
+    imports = {(_import_module(type_.__class__, module), type_.__class__.__name__)}
+    for nested_type in _nested_types(type_):
+        imports.update(_type_imports(nested_type))
+    return tuple(sorted(imports))
+
+def render_generic_type(type_: TypeEngine) -> RenderedType:
+    """Render the closest generic SQLAlchemy type, e.g. `String(length=45)` for MySQL's `VARCHAR(45)`."""
+
+    generic_type = type_.as_generic()
+    return RenderedType(repr(generic_type), generic_type.__class__.__name__, _type_imports(generic_type))
+
+def native_type_renderer(module: str) -> TypeRenderer:
+    """A renderer that keeps the reflected type as it is (e.g. PostgreSQL's `JSONB` or `UUID`), imported from `module`."""
+
+    def render_native_type(type_: TypeEngine) -> RenderedType:
+        return RenderedType(repr(type_), type_.__class__.__name__, _type_imports(type_, module))
+
+    return render_native_type
+
+
+def _freeze(value: typing.Any) -> typing.Hashable:
+    if isinstance(value, TypeEngine):
+        return _type_key(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    hash(value)
+    return value
+
+# The event dispatcher and MetaData of schema types (e.g. Boolean, Enum) differ for every column,
+# but don't change how the type is rendered
+_IGNORED_ATTRIBUTES = frozenset({"dispatch", "metadata"})
+
+def _type_key(type_: TypeEngine) -> typing.Hashable:
+    # Private attributes are caches (e.g. `_generic_type_affinity`) rather than parameters
+    return (type_.__class__, tuple(sorted(
+        (name, _freeze(value)) 
+        for name, value in vars(type_).items() 
+        if not name.startswith("_") and name not in _IGNORED_ATTRIBUTES
+    )))
+
+
+class TypeRegistry:
+    """Renders the types of reflected columns into code, remembering the result for every type.
+
+    Types are identified by their class and parameters (their public attributes), so the many `Integer()` or
+    `String(length=45)` columns of a schema are only converted and rendered once. At most `max_size` types
+    are remembered, dropping the least recently used ones first.
+
+    By default, types are converted to their closest generic SQLAlchemy type. `register` replaces the renderer
+    of a type class and its subclasses, e.g. to keep dialect-specific types.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._renderers: typing.Dict[typing.Type[TypeEngine], TypeRenderer] = {}
+        self._cache: typing.OrderedDict[typing.Hashable, RenderedType] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, type_class: typing.Type[TypeEngine], renderer: TypeRenderer):
+        with self._lock:
+            self._renderers[type_class] = renderer
+            self._cache.clear()
+
+    def renderer(self, type_class: typing.Type[TypeEngine]) -> TypeRenderer:
+        for base in type_class.__mro__:
+            renderer = self._renderers.get(base)
+            if renderer is not None:
+                return renderer
+        return render_generic_type
+
+    def render(self, type_: TypeEngine) -> RenderedType:
+        try:
+            key = _type_key(type_)
+        except TypeError:
+            # Types with unhashable parameters are rendered every time
+            return self.renderer(type_.__class__)(type_)
+
+        with self._lock:
+            rendered = self._cache.get(key)
+            if rendered is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return rendered
+            self.misses += 1
+
+        rendered = self.renderer(type_.__class__)(type_)
+        with self._lock:
+            self._cache[key] = rendered
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# The registry used by labs that aren't given one
+TYPE_REGISTRY = TypeRegistry()
@@ -1,7 +1,10 @@
 __all__ = [
+    "foreign_key_target",
     "get_engine_url",
     "pascal_case",
+    "python_identifier",
     "quoted_string",
 ]
 
-from .utils import get_engine_url, pascal_case, quoted_string
+from .utils import (foreign_key_target, get_engine_url, pascal_case,
+                    python_identifier, quoted_string)
@@ -1,9 +1,12 @@
 __all__ = ["pascal_case"]
 
+import keyword
 import re
 import typing
 from urllib.parse import quote
 
+from sqlalchemy import ForeignKey
+
 
 def quoted_string(input_str):
     contains_double_quote = '"' in input_str
@@ -19,6 +22,26 @@ def pascal_case(string: str) -> str:
 
     return re.sub(r"(_|-)+", " ", string).title().replace(" ", "")
 
+def python_identifier(string: str, reserved: typing.Collection[str] = (), suffix: str = "_") -> str:
+    """A valid Python identifier for `string`. Characters that can't be part of an identifier are replaced with
+    underscores, and `suffix` is appended to keywords and `reserved` names."""
+
+    identifier = re.sub(r"\W", "_", string)
+    if identifier == "" or identifier[0].isdigit():
+        identifier = f"_{identifier}"
+    if keyword.iskeyword(identifier) or identifier in reserved:
+        identifier += suffix
+    return identifier
+
+def foreign_key_target(foreign_key: ForeignKey) -> typing.Tuple[typing.Optional[str], str, str]:
+    """The schema, table and column a foreign key points to, parsed from its target specification
+    so that the referred table doesn't need to be part of the same MetaData."""
+
+    tokens = foreign_key.target_fullname.rsplit(".", 2)
+    if len(tokens) == 2:
+        return (None, tokens[0], tokens[1])
+    return (tokens[0], tokens[1], tokens[2])
+
 def get_engine_url(
         dialect: str, 
         username: str, 
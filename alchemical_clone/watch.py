@@ -0,0 +1,170 @@
+import re
+import threading
+import typing
+import warnings
+
+from sqlalchemy import Engine, MetaData
+
+from .alchemical_lab import AlchemicalLab, Plugin
+from .alchemical_table import AlchemicalTable
+from .instrumentation import Observer, measure
+from .output import OutputSink, PathLike, incremental_output_sink
+from .plugin_cache import PluginCache
+from .reflection import reflect
+from .reflection.catalog import catalog_signature
+from .schema_diff import SchemaDiff, diff_labs
+
+
+def _rebuild_lab(
+        lab: AlchemicalLab,
+        metadata: MetaData,
+        removed: typing.Set[str],
+        observer: typing.Optional[Observer],
+    ) -> AlchemicalLab:
+    """Build a new lab out of the reflected tables of `metadata` and the intermediate representation of every other
+    table of `lab`, except for the `removed` ones."""
+
+    reflected = {table.name: table for table in metadata.tables.values()}
+    new_lab = AlchemicalLab(observer=observer, type_registry=lab.type_registry)
+    restored: typing.List[typing.Tuple[AlchemicalTable, typing.Dict[str, typing.Any]]] = []
+    computed: typing.List[AlchemicalTable] = []
+
+    def add_reflected(name: str):
+        table = AlchemicalTable(reflected.pop(name), new_lab)
+        new_lab.add_table(table)
+        table.compute_column_properties()
+        computed.append(table)
+
+    # Constraints can refer to any other table, so they are only computed once every table exists
+    for table in lab.tables:
+        if table.name in removed:
+            continue
+        if table.name in reflected:
+            add_reflected(table.name)
+        else:
+            data = table.to_dict()
+            restored_table = AlchemicalTable.from_dict(data, new_lab)
+            new_lab.add_table(restored_table)
+            restored.append((restored_table, data))
+    for name in sorted(reflected):
+        add_reflected(name)
+
+    for table, data in restored:
+        constraints = []
+        for constraint in data["constraints"]:
+            referred_table = constraint["referred_table"]
+            if referred_table is not None and new_lab.table_from_name(referred_table["name"], referred_table["schema"]) is None:
+                warnings.warn(f"Skipped foreign key {constraint['name']} of table {table.name}, which refers to a table outside the lab")
+                continue
+            constraints.append(constraint)
+        table.restore_constraints({**data, "constraints": constraints})
+    for table in computed:
+        with measure(observer, "compute_properties", table.name) as measurement:
+            table.compute_constraint_properties()
+            measurement.count = len(table.columns)
+        table.detach()
+    return new_lab
+
+
+class CloneWatcher:
+    """Keeps a lab of the database behind `engine` in memory, and regenerates its clone when the schema changes.
+
+    Every `interval` seconds, a cheap signature of the catalog is read (see `reflection.catalog.CATALOG_SIGNATURES`).
+    Only the tables whose signature changed are reflected again, and the clone is regenerated incrementally, so only
+    the modules whose code changed are rewritten.
+    """
+
+    def __init__(
+            self,
+            engine: Engine,
+            directory: typing.Union[PathLike, OutputSink],
+            schema: typing.Optional[str] = None,
+            plugins: typing.Optional[typing.List[Plugin]] = None,
+            interval: float = 1.0,
+            lazy: bool = False,
+            jobs: int = 1,
+            plugin_cache: typing.Optional[PluginCache] = None,
+            on_change: typing.Optional[typing.Callable[[SchemaDiff], None]] = None,
+            observer: typing.Optional[Observer] = None,
+        ):
+        self.engine = engine
+        # Changes are written incrementally, so the sink must be able to remove modules
+        self.directory = incremental_output_sink(directory)
+        self.schema = schema
+        self.plugins = plugins
+        self.interval = interval
+        self.lazy = lazy
+        self.jobs = jobs
+        self.plugin_cache = plugin_cache
+        self.on_change = on_change
+        self.observer = observer
+        self.lab: typing.Optional[AlchemicalLab] = None
+        self._signature: typing.Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _catalog_signature(self) -> typing.Dict[str, str]:
+        with measure(self.observer, "catalog_signature") as measurement:
+            signature = catalog_signature(self.engine, self.schema)
+            measurement.count = len(signature)
+        return signature
+
+    def _create_clone(self):
+        self.lab.create_clone(
+            self.directory,
+            plugins=self.plugins,
+            incremental=True,
+            jobs=self.jobs,
+            lazy=self.lazy,
+            plugin_cache=self.plugin_cache,
+        )
+
+    def refresh(self) -> typing.Optional[SchemaDiff]:
+        """Check the schema for changes once, and regenerate the clone if there are any.
+
+        The first call builds the lab and generates the whole clone. Afterwards, the changes to the lab are returned,
+        or None if the schema didn't change.
+        """
+
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> typing.Optional[SchemaDiff]:
+        signature = self._catalog_signature()
+        if self.lab is None:
+            self.lab = AlchemicalLab.from_engine(self.engine, schema=self.schema, observer=self.observer)
+            self._create_clone()
+            self._signature = signature
+            return None
+
+        changed = sorted(name for name, table_hash in signature.items() if self._signature.get(name) != table_hash)
+        removed = self._signature.keys() - signature.keys()
+        if len(changed) == 0 and len(removed) == 0:
+            return None
+
+        metadata = MetaData()
+        if len(changed) > 0:
+            with measure(self.observer, "reflection") as measurement:
+                include = [re.compile(re.escape(name)) for name in changed]
+                metadata = reflect(self.engine, schema=self.schema, include=include, fk_depth=0)
+                measurement.count = len(metadata.tables)
+        lab = _rebuild_lab(self.lab, metadata, removed, self.observer)
+
+        diff = diff_labs(self.lab, lab)
+        self.lab = lab
+        self._create_clone()
+        self._signature = signature
+        if self.on_change is not None and not diff.is_empty:
+            self.on_change(diff)
+        return diff
+
+    def run(self):
+        """Refresh the clone every `interval` seconds, until `stop` is called."""
+
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,7 @@
+__all__ = [
+    "SchemaSpec",
+    "build_metadata",
+    "create_sqlite_database",
+]
+
+from .synthetic import SchemaSpec, build_metadata, create_sqlite_database
@@ -0,0 +1,150 @@
+"""Time each phase of a clone against a synthetic schema.
+
+Usage: python -m benchmarks.run --tables 1000 --output results.json [--baseline previous.json]
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+import sqlalchemy
+from sqlalchemy import MetaData
+
+import alchemical_clone
+from alchemical_clone.generated_code import GENERATOR_VERSION
+
+from .synthetic import SchemaSpec, build_metadata, create_sqlite_database
+
+_IMPORT_CODE = """\
+import sys, time
+import sqlalchemy.orm
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import {package}
+print(time.perf_counter() - start)
+"""
+
+
+def _timed(function: typing.Callable[[], typing.Any]) -> typing.Tuple[float, typing.Any]:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def _reflect(engine: sqlalchemy.Engine, spec: SchemaSpec, workers: int, bulk: bool) -> MetaData:
+    metadata = MetaData()
+    for schema in spec.schema_names:
+        for table in alchemical_clone.reflection.reflect(engine, schema=schema, workers=workers, bulk=bulk).tables.values():
+            table.to_metadata(metadata)
+    return metadata
+
+def run_once(spec: SchemaSpec, source: str, workdir: str, workers: int = 4, bulk: bool = True, jobs: int = 1) -> typing.Dict[str, float]:
+    """Run every phase once, returning the time taken by each, in seconds."""
+
+    timings = {}
+    if source == "sqlite":
+        database = os.path.join(workdir, "benchmark.db")
+        engine = create_sqlite_database(database, spec)
+        timings["reflection"], metadata = _timed(lambda: _reflect(engine, spec, workers, bulk))
+        engine.dispose()
+    else:
+        metadata = build_metadata(spec)
+
+    timings["lab"], lab = _timed(lambda: alchemical_clone.AlchemicalLab(metadata))
+    timings["plugin.one_to_many"], _ = _timed(lambda: alchemical_clone.plugins.one_to_many(lab))
+    timings["plugin.many_to_many"], _ = _timed(lambda: alchemical_clone.plugins.many_to_many(lab))
+
+    package = "benchmark_clone"
+    plugins = [alchemical_clone.plugins.one_to_many, alchemical_clone.plugins.many_to_many]
+    timings["create_clone"], _ = _timed(lambda: lab.create_clone(os.path.join(workdir, package), plugins=plugins, jobs=jobs))
+
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_CODE.format(package=package), workdir],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings["import"] = float(output.stdout.strip().splitlines()[-1])
+    return timings
+
+def run_benchmark(spec: SchemaSpec, source: str = "memory", repeat: int = 3, **kwargs) -> typing.Dict[str, typing.Any]:
+    """Run the benchmark `repeat` times and return machine-readable results."""
+
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            runs.append(run_once(spec, source, workdir, **kwargs))
+
+    return {
+        "generator_version": GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "source": source,
+        "options": kwargs,
+        "spec": dataclasses.asdict(spec),
+        "phases": {
+            phase: {"best": min(run[phase] for run in runs), "runs": [run[phase] for run in runs]}
+            for phase in runs[0]
+        },
+    }
+
+def compare(results: typing.Dict[str, typing.Any], baseline: typing.Dict[str, typing.Any]) -> str:
+    """Summarize how the best time of each phase changed relative to a baseline."""
+
+    lines = [f"{'phase':<24}{'baseline':>12}{'current':>12}{'ratio':>8}"]
+    for phase, timing in results["phases"].items():
+        if phase not in baseline["phases"]:
+            continue
+        before, after = baseline["phases"][phase]["best"], timing["best"]
+        ratio = after / before if before > 0 else float("inf")
+        lines.append(f"{phase:<24}{before:>12.4f}{after:>12.4f}{ratio:>8.2f}")
+    return "\n".join(lines)
+
+def main(argv: typing.Optional[typing.List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Alchemical Clone against a synthetic schema.")
+    parser.add_argument("--tables", type=int, default=SchemaSpec.tables)
+    parser.add_argument("--columns", type=int, default=SchemaSpec.columns_per_table)
+    parser.add_argument("--fk-density", type=float, default=SchemaSpec.fk_density)
+    parser.add_argument("--junction-tables", type=int, default=SchemaSpec.junction_tables)
+    parser.add_argument("--indexes", type=int, default=SchemaSpec.indexes_per_table)
+    parser.add_argument("--schemas", type=int, default=SchemaSpec.schemas)
+    parser.add_argument("--seed", type=int, default=SchemaSpec.seed)
+    parser.add_argument("--source", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-bulk", action="store_true", help="use SQLAlchemy's generic reflection")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with a previous JSON results file")
+    args = parser.parse_args(argv)
+
+    spec = SchemaSpec(
+        tables=args.tables,
+        columns_per_table=args.columns,
+        fk_density=args.fk_density,
+        junction_tables=args.junction_tables,
+        indexes_per_table=args.indexes,
+        schemas=args.schemas,
+        seed=args.seed,
+    )
+    results = run_benchmark(spec, args.source, args.repeat, workers=args.workers, bulk=not args.no_bulk, jobs=args.jobs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            print(compare(results, json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
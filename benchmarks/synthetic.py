@@ -0,0 +1,111 @@
+import dataclasses
+import random
+import typing
+
+from sqlalchemy import (Boolean, Column, DateTime, Engine, ForeignKeyConstraint,
+                        Index, Integer, MetaData, Numeric, String, Table, Text,
+                        create_engine, event)
+
+_COLUMN_TYPES = (
+    lambda: Integer(),
+    lambda: String(45),
+    lambda: String(255),
+    lambda: Text(),
+    lambda: DateTime(),
+    lambda: Numeric(10, 2),
+    lambda: Boolean(),
+)
+
+
+@dataclasses.dataclass
+class SchemaSpec:
+    """The shape of a synthetic schema."""
+
+    tables: int = 100
+    columns_per_table: int = 10
+    # Average number of foreign keys per table, each pointing to a random table created before it
+    fk_density: float = 1.0
+    junction_tables: int = 10
+    indexes_per_table: int = 1
+    schemas: int = 1
+    seed: int = 0
+
+    @property
+    def schema_names(self) -> typing.List[typing.Optional[str]]:
+        if self.schemas <= 1:
+            return [None]
+        return [f"schema_{i}" for i in range(self.schemas)]
+
+
+def _table_name(schema: typing.Optional[str], i: typing.Union[int, str]) -> str:
+    # Table names are unique across schemas, since the clone uses one module per table name
+    prefix = f"{schema}_" if schema is not None else ""
+    return f"{prefix}table_{i}"
+
+def build_metadata(spec: SchemaSpec) -> MetaData:
+    """Build an in-memory MetaData with the shape described by `spec`."""
+
+    rng = random.Random(spec.seed)
+    metadata = MetaData()
+
+    for schema in spec.schema_names:
+        names = []
+        for i in range(spec.tables):
+            name = _table_name(schema, i)
+            columns = [Column("id", Integer(), primary_key=True)]
+            columns.extend(
+                Column(f"column_{j}", rng.choice(_COLUMN_TYPES)(), nullable=rng.random() < 0.5)
+                for j in range(spec.columns_per_table - 1)
+            )
+
+            constraints = []
+            if len(names) > 0:
+                fk_count = int(spec.fk_density) + (1 if rng.random() < spec.fk_density % 1 else 0)
+                for k in range(fk_count):
+                    referred = rng.choice(names)
+                    column_name = f"fk_{k}_id"
+                    columns.append(Column(column_name, Integer(), nullable=True))
+                    target = f"{schema}.{referred}.id" if schema is not None else f"{referred}.id"
+                    constraints.append(ForeignKeyConstraint([column_name], [target], name=f"fk_{name}_{k}"))
+
+            indexed = rng.sample(columns[1:], min(spec.indexes_per_table, len(columns) - 1))
+            constraints.extend(Index(f"ix_{name}_{column.name}", column.name) for column in indexed)
+
+            Table(name, metadata, *columns, *constraints, schema=schema)
+            names.append(name)
+
+        for i in range(spec.junction_tables if len(names) >= 2 else 0):
+            left, right = rng.sample(names, 2)
+            name = _table_name(schema, f"junction_{i}")
+            prefix = f"{schema}." if schema is not None else ""
+            Table(
+                name,
+                metadata,
+                Column("id", Integer(), primary_key=True),
+                Column("left_id", Integer(), nullable=False),
+                Column("right_id", Integer(), nullable=False),
+                ForeignKeyConstraint(["left_id"], [f"{prefix}{left}.id"], name=f"fk_{name}_left"),
+                ForeignKeyConstraint(["right_id"], [f"{prefix}{right}.id"], name=f"fk_{name}_right"),
+                schema=schema,
+            )
+
+    return metadata
+
+def sqlite_engine(path: str, spec: SchemaSpec) -> Engine:
+    """Create an engine for a SQLite database at `path`, with one attached database per schema of `spec`."""
+
+    engine = create_engine(f"sqlite:///{path}")
+    schemas = [schema for schema in spec.schema_names if schema is not None]
+    if len(schemas) > 0:
+        @event.listens_for(engine, "connect")
+        def attach_schemas(dbapi_connection, connection_record):
+            for schema in schemas:
+                dbapi_connection.execute(f"ATTACH DATABASE '{path}.{schema}' AS {schema}")
+    return engine
+
+def create_sqlite_database(path: str, spec: SchemaSpec) -> Engine:
+    """Create the schema described by `spec` in a SQLite database, and return an engine for it."""
+
+    engine = sqlite_engine(path, spec)
+    build_metadata(spec).create_all(engine)
+    return engine
@@ -0,0 +1,119 @@
+import importlib
+import sys
+import typing
+
+import pytest
+import sqlalchemy
+from sqlalchemy.pool import StaticPool
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.output import MemorySink
+from benchmarks.synthetic import SchemaSpec, build_metadata
+
+SCHEMA = """
+CREATE TABLE languages (
+    id INTEGER PRIMARY KEY,
+    code VARCHAR(2) NOT NULL
+);
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    email VARCHAR(45) NOT NULL,
+    bio TEXT,
+    lang_id INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT fk_lang FOREIGN KEY (lang_id) REFERENCES languages (id) ON UPDATE CASCADE,
+    CONSTRAINT uq_users_email UNIQUE (email)
+);
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    created DATETIME,
+    CONSTRAINT fk_orders_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    CONSTRAINT ck_orders_id CHECK (id > 0)
+);
+CREATE INDEX ix_users_lang ON users (lang_id);
+CREATE UNIQUE INDEX ix_orders_user_created ON orders (user_id, created);
+"""
+
+
+def _execute_script(engine: sqlalchemy.Engine, script: str):
+    with engine.begin() as connection:
+        for statement in script.split(";"):
+            if statement.strip() != "":
+                connection.exec_driver_sql(statement)
+
+
+class RecordingSink(MemorySink):
+    """A `MemorySink` that remembers which modules were written and removed."""
+
+    def __init__(self):
+        super().__init__()
+        self.written: typing.List[str] = []
+        self.removed: typing.List[str] = []
+
+    def write(self, path: str, code: str):
+        self.written.append(path)
+        super().write(path, code)
+
+    def remove(self, path: str):
+        self.removed.append(path)
+        super().remove(path)
+
+
+@pytest.fixture
+def engine():
+    # A single shared connection, so every part of the library sees the same in-memory database
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    _execute_script(engine, SCHEMA)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """The test database in a file, so that several connections can read it at the same time."""
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'database.db'}")
+    _execute_script(engine, SCHEMA)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def execute(engine):
+    """Runs a script of `;`-separated statements against the test database."""
+
+    return lambda script: _execute_script(engine, script)
+
+
+@pytest.fixture
+def lab(engine) -> AlchemicalLab:
+    return AlchemicalLab.from_engine(engine, workers=1)
+
+
+@pytest.fixture
+def recording_sink() -> RecordingSink:
+    return RecordingSink()
+
+
+@pytest.fixture
+def import_clone(tmp_path, monkeypatch):
+    """Imports a package generated into `tmp_path`, and forgets it again after the test."""
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    packages = []
+
+    def import_package(package: str):
+        packages.append(package.split(".")[0])
+        return importlib.import_module(package)
+
+    yield import_package
+    for name in list(sys.modules):
+        if name.split(".")[0] in packages:
+            del sys.modules[name]
+
+
+@pytest.fixture
+def synthetic_lab() -> AlchemicalLab:
+    """A lab for a larger, randomly shaped schema, with junction tables for the many-to-many plugin."""
+
+    return AlchemicalLab(build_metadata(SchemaSpec(tables=40, columns_per_table=6, junction_tables=5)))
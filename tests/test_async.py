@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from alchemical_clone import AlchemicalLab
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def test_from_async_engine_selects_tables_like_from_engine(file_engine):
+    async def from_async_engine():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{file_engine.url.database}")
+        try:
+            return await AlchemicalLab.from_async_engine(async_engine, workers=2, include="users", fk_depth=0)
+        finally:
+            await async_engine.dispose()
+
+    with pytest.warns(UserWarning, match="fk_lang"):
+        lab = asyncio.run(from_async_engine())
+    with pytest.warns(UserWarning, match="fk_lang"):
+        expected = AlchemicalLab.from_engine(file_engine, workers=1, include="users", fk_depth=0)
+
+    assert [table.name for table in lab.tables] == ["users"]
+    assert lab.fingerprint() == expected.fingerprint()
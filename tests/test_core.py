@@ -0,0 +1,42 @@
+import sqlalchemy
+
+from alchemical_clone import AlchemicalLab
+
+
+def build_lab() -> AlchemicalLab:
+    # Both names would shadow a name the generated modules need
+    metadata = sqlalchemy.MetaData()
+    sqlalchemy.Table("metadata", metadata, sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True))
+    sqlalchemy.Table(
+        "Integer", metadata,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("metadata_id", sqlalchemy.Integer),
+        sqlalchemy.ForeignKeyConstraint(["metadata_id"], ["metadata.id"], name="fk_metadata"),
+    )
+    return AlchemicalLab(metadata)
+
+
+def test_core_names_avoid_shadowing(tmp_path):
+    lab = build_lab()
+    lab.to_snapshot(tmp_path / "snapshot.json")
+
+    for restored_lab in (lab, AlchemicalLab.from_snapshot(tmp_path / "snapshot.json")):
+        assert restored_lab.table_from_name("metadata").core_name == "metadata_table"
+        assert restored_lab.table_from_name("Integer").core_name == "Integer_table"
+
+
+def test_core_clone_is_importable(tmp_path, import_clone):
+    build_lab().create_clone(tmp_path / "core_clone", mode="core")
+    package = import_clone("core_clone")
+
+    assert isinstance(package.metadata, sqlalchemy.MetaData)
+    assert package.metadata.tables["Integer"] is package.Integer_table
+    assert package.Integer_table.c.metadata_id.references(package.metadata_table.c.id)
+
+
+def test_both_modes_generate_core_tables_next_to_the_classes(tmp_path, import_clone):
+    build_lab().create_clone(tmp_path / "both_clone", mode="both")
+    package = import_clone("both_clone")
+    core = import_clone("both_clone.core")
+
+    assert package.Integer.__table__.name == core.Integer_table.name == "Integer"
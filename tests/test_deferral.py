@@ -0,0 +1,23 @@
+from alchemical_clone.deferral import DeferralPolicy
+from alchemical_clone.output import MemorySink
+
+
+def test_deferral_policy_only_applies_to_its_clone(lab):
+    deferred_sink = MemorySink()
+    lab.create_clone(deferred_sink, deferral_policy=DeferralPolicy(group="{table}_large"))
+    plain_sink = MemorySink()
+    lab.create_clone(plain_sink)
+
+    assert 'deferred(Column("bio"' in deferred_sink.files["users.py"]
+    assert "deferred(" not in plain_sink.files["users.py"]
+    assert all(column.deferral() == (False, None) for table in lab.tables for column in table.columns)
+
+
+def test_deferral_policy_changes_the_module_fingerprint(lab):
+    sink = MemorySink()
+    lab.create_clone(sink, incremental=True)
+    lab.create_clone(sink, incremental=True, deferral_policy=DeferralPolicy())
+    assert "deferred(" in sink.files["users.py"]
+
+    lab.create_clone(sink, incremental=True)
+    assert "deferred(" not in sink.files["users.py"]
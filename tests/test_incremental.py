@@ -0,0 +1,24 @@
+from alchemical_clone import AlchemicalLab
+
+
+def test_incremental_clone_of_an_unchanged_lab_writes_nothing(lab, recording_sink):
+    lab.create_clone(recording_sink, incremental=True)
+    assert {"__init__.py", "_base.py", "users.py", "orders.py", "languages.py"} <= set(recording_sink.written)
+
+    recording_sink.written.clear()
+    lab.create_clone(recording_sink, incremental=True)
+    assert recording_sink.written == []
+    assert recording_sink.removed == []
+
+
+def test_incremental_clone_removes_modules_of_dropped_tables(engine, execute, lab, recording_sink):
+    lab.create_clone(recording_sink, incremental=True)
+
+    execute("DROP TABLE orders")
+    recording_sink.written.clear()
+    AlchemicalLab.from_engine(engine, workers=1).create_clone(recording_sink, incremental=True)
+
+    assert recording_sink.removed == ["orders.py"]
+    assert "orders.py" not in recording_sink.files
+    assert "Orders" not in recording_sink.files["__init__.py"]
+    assert "users.py" not in recording_sink.written
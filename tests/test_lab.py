@@ -0,0 +1,38 @@
+import pytest
+import sqlalchemy
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.output import MemorySink
+
+
+@pytest.fixture
+def two_schemas_lab() -> AlchemicalLab:
+    metadata = sqlalchemy.MetaData()
+    for schema in ("a", "b"):
+        sqlalchemy.Table("users", metadata, sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True), schema=schema)
+    return AlchemicalLab(metadata)
+
+
+def test_tables_with_the_same_name_are_looked_up_by_schema(two_schemas_lab):
+    a_users = two_schemas_lab.table_from_name("users", "a")
+    b_users = two_schemas_lab.table_from_name("users", "b")
+
+    assert (a_users.schema, b_users.schema) == ("a", "b")
+    assert two_schemas_lab.tables_from_name("users") == [a_users, b_users]
+    assert a_users.column_from_name("id") is not None
+
+
+def test_columns_of_tables_in_different_schemas_are_distinct(two_schemas_lab):
+    a_id = two_schemas_lab.table_from_name("users", "a").column_from_name("id")
+    b_id = two_schemas_lab.table_from_name("users", "b").column_from_name("id")
+
+    assert a_id.fullname == "a.users.id"
+    assert a_id != b_id
+    assert len({a_id, b_id}) == 2
+
+
+def test_clone_of_tables_sharing_a_module_is_rejected(two_schemas_lab):
+    sink = MemorySink()
+    with pytest.raises(ValueError, match="a.users and b.users"):
+        two_schemas_lab.create_clone(sink)
+    assert sink.files == {}
@@ -0,0 +1,27 @@
+import sys
+
+
+def test_models_are_imported_on_first_access(lab, tmp_path, import_clone):
+    lab.create_clone(tmp_path / "lazy_clone", lazy=True)
+    package = import_clone("lazy_clone")
+
+    assert "lazy_clone.orders" not in sys.modules
+    orders = package.Orders
+    assert "lazy_clone.orders" in sys.modules
+    assert "lazy_clone.users" not in sys.modules
+
+    # Configuring the mappers imports the targets of the loaded relationships, and theirs in turn
+    package._base.Base.registry.configure()
+    assert orders.fk_orders_user.property.mapper.class_ is package.Users
+    assert "lazy_clone.languages" in sys.modules
+
+
+def test_load_all_models(lab, tmp_path, import_clone):
+    lab.create_clone(tmp_path / "lazy_clone", lazy=True)
+    package = import_clone("lazy_clone")
+
+    package.load_all_models()
+
+    assert {"lazy_clone.languages", "lazy_clone.orders", "lazy_clone.users"} <= set(sys.modules)
+    assert {"Languages", "Orders", "Users"} <= set(dir(package))
+    package._base.Base.registry.configure()
@@ -0,0 +1,53 @@
+import pytest
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from alchemical_clone.multi_schema import clone_schemas
+
+TENANTS = ("tenant_a", "tenant_b", "tenant_c")
+
+
+@pytest.fixture
+def tenant_engine(tmp_path):
+    """A database with one attached database, i.e. one schema, per tenant. `tenant_c` has an extra table."""
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+
+    @sqlalchemy.event.listens_for(engine, "connect")
+    def attach_tenants(dbapi_connection, connection_record):
+        for tenant in TENANTS:
+            dbapi_connection.execute(f"ATTACH DATABASE '{tmp_path / tenant}.db' AS {tenant}")
+
+    with engine.begin() as connection:
+        for tenant in TENANTS:
+            connection.exec_driver_sql(f"CREATE TABLE {tenant}.users (id INTEGER PRIMARY KEY, email VARCHAR(45) NOT NULL)")
+            connection.exec_driver_sql(
+                f"CREATE TABLE {tenant}.orders (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "CONSTRAINT fk_orders_user FOREIGN KEY (user_id) REFERENCES users (id))"
+            )
+        connection.exec_driver_sql("CREATE TABLE tenant_c.tags (id INTEGER PRIMARY KEY, name VARCHAR(20))")
+    yield engine
+    engine.dispose()
+
+
+def test_schemas_with_the_same_tables_share_their_models(tenant_engine, tmp_path):
+    shapes = clone_schemas(tenant_engine, TENANTS, tmp_path / "tenants", workers=1)
+
+    assert shapes["tenant_a"] == shapes["tenant_b"] != shapes["tenant_c"]
+    # The users and orders of every tenant are generated once, and the tags of `tenant_c` separately
+    assert len(list(tmp_path.glob("tenants/component_*"))) == 2
+
+
+def test_for_schema_runs_statements_against_a_tenant(tenant_engine, tmp_path, import_clone):
+    clone_schemas(tenant_engine, TENANTS, tmp_path / "tenants", workers=1)
+    package = import_clone("tenants")
+    users = package.models("tenant_b").Users
+    assert package.models("tenant_c").Users is users
+
+    with Session(package.for_schema(tenant_engine, "tenant_b")) as session:
+        session.add(users(id=1, email="b@example.com"))
+        session.commit()
+
+    with tenant_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT email FROM tenant_b.users").all() == [("b@example.com",)]
+        assert connection.exec_driver_sql("SELECT email FROM tenant_a.users").all() == []
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from alchemical_clone.output import DirectorySink, MemorySink, ZipSink
+
+
+def test_memory_sink_holds_the_same_modules_as_a_directory(lab, tmp_path):
+    sink = MemorySink()
+    lab.create_clone(sink)
+    lab.create_clone(tmp_path / "clone")
+
+    for path, code in sink.files.items():
+        assert (tmp_path / "clone" / path).read_text(encoding="utf-8") == code
+    assert {"__init__.py", "_base.py", "languages.py", "orders.py", "users.py"} <= sink.files.keys()
+
+
+def test_zip_archives_are_importable(lab, tmp_path, monkeypatch, import_clone):
+    with ZipSink(tmp_path / "clone.zip", root="zipped_clone") as sink:
+        lab.create_clone(sink)
+    monkeypatch.syspath_prepend(str(tmp_path / "clone.zip"))
+    package = import_clone("zipped_clone")
+
+    assert package.Orders.__tablename__ == "orders"
+    package._base.Base.registry.configure()
+
+
+def test_incremental_clones_need_a_sink_that_can_remove_modules(lab, tmp_path):
+    with ZipSink(tmp_path / "clone.zip") as sink:
+        with pytest.raises(ValueError):
+            lab.create_clone(sink, incremental=True)
+
+
+def test_atomic_writes_leave_no_temporary_files(tmp_path):
+    sink = DirectorySink(tmp_path / "clone")
+    sink.write("package/module.py", "first = 1\n")
+    sink.write("package/module.py", "second = 2\n")
+
+    assert sink.read("package/module.py") == "second = 2\n"
+    assert os.listdir(tmp_path / "clone" / "package") == ["module.py"]
+
+
+def test_interrupted_atomic_writes_keep_the_previous_module(tmp_path, monkeypatch):
+    sink = DirectorySink(tmp_path / "clone")
+    sink.write("module.py", "first = 1\n")
+
+    def interrupted_replace(source, destination):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(os, "replace", interrupted_replace)
+    with pytest.raises(KeyboardInterrupt):
+        sink.write("module.py", "second = 2\n")
+
+    assert sink.read("module.py") == "first = 1\n"
+    assert os.listdir(tmp_path / "clone") == ["module.py"]
@@ -0,0 +1,12 @@
+from alchemical_clone import plugins
+from alchemical_clone.output import MemorySink
+
+
+def test_parallel_generation_matches_serial_generation(synthetic_lab):
+    serial = MemorySink()
+    synthetic_lab.create_clone(serial, plugins=[plugins.one_to_many, plugins.many_to_many])
+    parallel = MemorySink()
+    synthetic_lab.create_clone(parallel, plugins=[plugins.one_to_many, plugins.many_to_many], jobs=4)
+
+    assert len(serial.files) > 40
+    assert parallel.files == serial.files
@@ -0,0 +1,57 @@
+import collections
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.alchemical_lab import PluginResult
+from alchemical_clone.generated_code import GeneratedCode
+from alchemical_clone.output import MemorySink
+from alchemical_clone.plugin_cache import PluginCache
+
+CALLS = collections.Counter()
+
+
+def comment_plugin(comment: str):
+    def plugin(lab: AlchemicalLab) -> PluginResult:
+        CALLS[comment] += 1
+        return PluginResult({}, {"users": [GeneratedCode(f"# {comment}", "end")]})
+    return plugin
+
+
+def test_cached_results_are_reused_for_an_unchanged_lab(lab, tmp_path):
+    cache = PluginCache(tmp_path)
+    sink = MemorySink()
+    for _ in range(2):
+        lab.create_clone(sink, plugins=[comment_plugin("reused")], plugin_cache=cache)
+
+    assert CALLS["reused"] == 1
+    assert "# reused" in sink.files["users.py"]
+
+
+def test_cached_results_are_invalidated_by_a_different_closure(lab, tmp_path):
+    cache = PluginCache(tmp_path)
+    lab.create_clone(MemorySink(), plugins=[comment_plugin("first")], plugin_cache=cache)
+    sink = MemorySink()
+    lab.create_clone(sink, plugins=[comment_plugin("second")], plugin_cache=cache)
+
+    assert CALLS["second"] == 1
+    assert "# second" in sink.files["users.py"]
+
+
+def test_cached_results_are_invalidated_by_a_schema_change(engine, execute, lab, tmp_path):
+    cache = PluginCache(tmp_path)
+    lab.create_clone(MemorySink(), plugins=[comment_plugin("schema")], plugin_cache=cache)
+    execute("ALTER TABLE users ADD COLUMN nickname VARCHAR(20)")
+    AlchemicalLab.from_engine(engine, workers=1).create_clone(MemorySink(), plugins=[comment_plugin("schema")], plugin_cache=cache)
+
+    assert CALLS["schema"] == 2
+
+
+def test_cached_results_are_invalidated_by_loading_strategies(lab, tmp_path):
+    cache = PluginCache(tmp_path)
+    lab.create_clone(MemorySink(), plugins=[comment_plugin("loading")], plugin_cache=cache)
+    for table in lab.tables:
+        for constraint in table.constraints:
+            if constraint.referred_table is not None:
+                constraint.reverse_lazy = "selectin"
+    lab.create_clone(MemorySink(), plugins=[comment_plugin("loading")], plugin_cache=cache)
+
+    assert CALLS["loading"] == 2
@@ -0,0 +1,71 @@
+import pytest
+import sqlalchemy
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.reflection import reflect, reflect_metadata, sqlite
+
+
+def structures(lab: AlchemicalLab):
+    return {(table.schema, table.name): table.structure() for table in lab.tables}
+
+
+def test_concurrent_reflection_matches_a_single_connection(file_engine):
+    metadata = sqlalchemy.MetaData()
+    with file_engine.connect() as connection:
+        metadata.reflect(bind=connection)
+    expected = AlchemicalLab(metadata)
+
+    lab = AlchemicalLab.from_engine(file_engine, workers=4, bulk=False)
+
+    assert [table.name for table in lab.tables] == [table.name for table in expected.tables]
+    assert structures(lab) == structures(expected)
+
+
+def test_every_batch_is_merged(file_engine):
+    metadata = reflect_metadata(file_engine, workers=3, batch_size=1)
+
+    assert sorted(metadata.tables) == ["languages", "orders", "users"]
+    # Foreign keys between batches still point at the merged tables
+    assert metadata.tables["orders"].c.user_id.references(metadata.tables["users"].c.id)
+
+
+def test_bulk_and_generic_reflection_build_the_same_lab(engine):
+    bulk_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=True)
+    generic_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=False)
+
+    assert [table.name for table in bulk_lab.tables] == [table.name for table in generic_lab.tables]
+    assert structures(bulk_lab) == structures(generic_lab)
+
+
+def test_bulk_reflection_falls_back_without_type_affinity(engine, monkeypatch):
+    monkeypatch.setattr(sqlite, "_TYPE_AFFINITY_VERSIONS", ())
+    fallback_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=True)
+    generic_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=False)
+
+    assert structures(fallback_lab) == structures(generic_lab)
+
+
+def test_index_uniqueness_is_a_bool(lab):
+    indexes = {index.name: index for table in lab.tables for index in table.indexes}
+
+    assert indexes["ix_users_lang"].unique is False
+    assert indexes["ix_orders_user_created"].unique is True
+
+
+def test_bulk_reflection_keeps_actions_of_inline_foreign_keys(engine, execute):
+    execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id) ON DELETE CASCADE)")
+
+    notes = reflect(engine, bulk=True).tables["notes"]
+    foreign_key, = notes.foreign_key_constraints
+    assert foreign_key.ondelete == "CASCADE"
+
+
+def test_bulk_and_generic_reflection_of_a_selection(engine):
+    # `languages` is two levels away from `orders`, so the foreign key of `users` to it is dropped
+    with pytest.warns(UserWarning, match="fk_lang"):
+        bulk_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=True, include="orders", fk_depth=1)
+    with pytest.warns(UserWarning, match="fk_lang"):
+        generic_lab = AlchemicalLab.from_engine(engine, workers=1, bulk=False, include="orders", fk_depth=1)
+
+    assert sorted(table.name for table in bulk_lab.tables) == ["orders", "users"]
+    assert structures(bulk_lab) == structures(generic_lab)
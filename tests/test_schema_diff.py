@@ -0,0 +1,51 @@
+import sqlalchemy
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.schema_diff import diff_labs
+
+
+def build_lab(version: int) -> AlchemicalLab:
+    metadata = sqlalchemy.MetaData()
+    sqlalchemy.Table(
+        "users", metadata,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("email", sqlalchemy.String(45 if version == 1 else 120), nullable=False),
+        *([sqlalchemy.Column("nickname", sqlalchemy.String(20))] if version == 2 else []),
+        *([sqlalchemy.UniqueConstraint("email")] if version == 2 else []),
+    )
+    sqlalchemy.Table(
+        "orders", metadata,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    )
+    sqlalchemy.Table(
+        "sessions" if version == 1 else "tokens", metadata,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    )
+    return AlchemicalLab(metadata)
+
+
+def test_tables_are_added_removed_and_altered():
+    diff = diff_labs(build_lab(1), build_lab(2))
+
+    assert [table.name for table in diff.added] == ["tokens"]
+    assert [table.name for table in diff.removed] == ["sessions"]
+    users, = diff.altered
+    assert users.name == "users"
+    changes = {(element.kind, element.name): element for element in users.elements}
+    assert changes.keys() == {("column", "nickname"), ("column", "email"), ("constraint", "UniqueConstraint(email)")}
+    assert changes["column", "nickname"].change == "added"
+    assert changes["constraint", "UniqueConstraint(email)"].change == "added"
+    assert changes["column", "email"].change == "altered"
+    assert changes["column", "email"].fields == {"type": ("String(length=45)", "String(length=120)")}
+
+
+def test_loading_strategies_are_not_schema_changes():
+    old, new = build_lab(1), build_lab(1)
+    for table in new.tables:
+        for constraint in table.constraints:
+            if constraint.referred_table is not None:
+                constraint.lazy, constraint.reverse_lazy = "joined", "selectin"
+
+    assert diff_labs(old, new).is_empty
+    assert old.fingerprint() != new.fingerprint()
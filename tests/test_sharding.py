@@ -0,0 +1,42 @@
+from alchemical_clone.plugins import many_to_many, one_to_many
+from alchemical_clone.sharding import ShardLayout, assign_shards, table_size
+
+
+def test_relationships_stay_within_a_component_shard(synthetic_lab, tmp_path, import_clone):
+    layout = ShardLayout(shards=4)
+    shards = assign_shards(synthetic_lab, layout)
+
+    shard_of = {table: shard for shard, tables in shards.items() for table in tables}
+    assert len(shard_of) == len(synthetic_lab.tables)
+    for table in synthetic_lab.tables:
+        for constraint in table.constraints:
+            if constraint.referred_table is not None:
+                assert shard_of[constraint.referred_table] == shard_of[table]
+
+    synthetic_lab.create_clone(tmp_path / "component_clone", plugins=[one_to_many, many_to_many], layout=layout)
+    assert sorted(path.name for path in (tmp_path / "component_clone").glob("_shard_*.py")) == sorted(f"{shard}.py" for shard in shards)
+    package = import_clone("component_clone")
+    package._base.Base.registry.configure()
+
+
+def test_size_shards_are_about_the_same_size(synthetic_lab, tmp_path, import_clone):
+    layout = ShardLayout(shards=3, shard_by="size")
+    shards = assign_shards(synthetic_lab, layout)
+
+    assert list(shards) == ["_shard_0", "_shard_1", "_shard_2"]
+    sizes = [sum(table_size(table) for table in tables) for tables in shards.values()]
+    # Every table goes to the shard its middle falls in, so no shard is more than a table away from an equal share
+    for size in sizes:
+        assert abs(size - sum(sizes) / 3) <= max(table_size(table) for table in synthetic_lab.tables)
+
+    synthetic_lab.create_clone(tmp_path / "size_clone", layout=layout)
+    package = import_clone("size_clone")
+    package._base.Base.registry.configure()
+    assert {table.class_name for table in synthetic_lab.tables} <= set(dir(package))
+
+
+def test_size_shards_respect_max_size(synthetic_lab):
+    shards = assign_shards(synthetic_lab, ShardLayout(shard_by="size", max_size=30))
+
+    for tables in shards.values():
+        assert len(tables) == 1 or sum(table_size(table) for table in tables) <= 30
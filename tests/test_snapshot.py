@@ -0,0 +1,27 @@
+from alchemical_clone import AlchemicalLab, plugins
+from alchemical_clone.deferral import DeferralPolicy, defer_columns
+from alchemical_clone.output import MemorySink
+
+
+def test_a_restored_snapshot_generates_the_same_clone(lab, tmp_path):
+    path = tmp_path / "schema.json.gz"
+    lab.to_snapshot(path)
+    restored = AlchemicalLab.from_snapshot(path)
+
+    expected = MemorySink()
+    lab.create_clone(expected, plugins=[plugins.one_to_many])
+    clone = MemorySink()
+    restored.create_clone(clone, plugins=[plugins.one_to_many])
+
+    assert restored.fingerprint() == lab.fingerprint()
+    assert clone.files == expected.files
+
+
+def test_snapshots_leave_out_column_deferral(lab, tmp_path):
+    defer_columns(lab, DeferralPolicy())
+    path = tmp_path / "schema.json"
+    lab.to_snapshot(path)
+    restored = AlchemicalLab.from_snapshot(path)
+
+    assert any(column.deferred for table in lab.tables for column in table.columns)
+    assert all(column.deferral() == (False, None) for table in restored.tables for column in table.columns)
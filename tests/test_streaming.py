@@ -0,0 +1,54 @@
+import threading
+
+from alchemical_clone import AlchemicalLab
+from alchemical_clone.output import MemorySink
+from alchemical_clone.plugins import one_to_many
+from alchemical_clone.streaming import stream_clone
+
+
+class LoggingSink(MemorySink):
+    def __init__(self, log: list):
+        super().__init__()
+        self.log = log
+        self.written = threading.Event()
+
+    def write(self, path: str, code: str):
+        super().write(path, code)
+        self.log.append(("write", path))
+        if path not in ("_base.py", "__init__.py"):
+            self.written.set()
+
+
+def test_modules_are_written_before_reflection_finishes(file_engine):
+    log = []
+    sink = LoggingSink(log)
+
+    def observer(event):
+        if event.phase == "reflection":
+            # Once the first batch is in, give the writers time to write its table before reflecting further
+            if any(kind == "reflection" for kind, _ in log):
+                sink.written.wait(timeout=5)
+            log.append(("reflection", event.count))
+
+    stream_clone(file_engine, sink, plugins=[one_to_many], workers=1, batch_size=1, observer=observer)
+
+    first_write = next(i for i, (kind, path) in enumerate(log) if kind == "write" and path == "languages.py")
+    last_reflection = max(i for i, (kind, count) in enumerate(log) if kind == "reflection" and count is not None)
+    assert first_write < last_reflection
+
+
+def test_only_modules_with_plugin_contributions_are_rewritten(file_engine):
+    log = []
+    sink = LoggingSink(log)
+    stream_clone(file_engine, sink, plugins=[one_to_many], workers=1, batch_size=1)
+
+    writes = [path for kind, path in log if kind == "write"]
+    # `orders` refers to `users`, which refers to `languages`, so only those two get the other sides of the relationships
+    assert sorted(path for path in set(writes) if writes.count(path) > 1) == ["languages.py", "users.py"]
+
+    expected = MemorySink()
+    AlchemicalLab.from_engine(file_engine, workers=1).create_clone(expected, plugins=[one_to_many])
+    # The package's `__init__.py` lists the tables in the order they were reflected in, and the order of table
+    # arguments follows SQLAlchemy's set of constraints, which differs between labs
+    for path in ("languages.py", "orders.py", "users.py"):
+        assert sorted(sink.files[path].splitlines()) == sorted(expected.files[path].splitlines())
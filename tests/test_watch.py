@@ -0,0 +1,22 @@
+from alchemical_clone.watch import CloneWatcher
+
+
+def test_refresh_only_rewrites_the_modules_of_changed_tables(file_engine, recording_sink):
+    watcher = CloneWatcher(file_engine, recording_sink)
+    assert watcher.refresh() is None
+    assert {"languages.py", "orders.py", "users.py"} <= set(recording_sink.written)
+    assert watcher.refresh() is None
+
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE users ADD COLUMN nickname VARCHAR(20)")
+        connection.exec_driver_sql("CREATE TABLE tags (id INTEGER PRIMARY KEY, name VARCHAR(20) NOT NULL)")
+        connection.exec_driver_sql("DROP TABLE orders")
+    recording_sink.written.clear()
+    diff = watcher.refresh()
+
+    assert [table.name for table in diff.added] == ["tags"]
+    assert [table.name for table in diff.removed] == ["orders"]
+    assert [table.name for table in diff.altered] == ["users"]
+    assert sorted(path for path in recording_sink.written if path != "_manifest.json") == ["__init__.py", "tags.py", "users.py"]
+    assert recording_sink.removed == ["orders.py"]
+    assert "nickname" in recording_sink.files["users.py"]